@@ -0,0 +1,48 @@
+"""Intercept and monitor changes in external log files."""
+
+from log_interceptor.config import InterceptorConfig
+from log_interceptor.exceptions import (
+    ConfigurationError,
+    FileWatchError,
+    FilterError,
+    LogBufferError,
+    LogInterceptorError,
+)
+from log_interceptor.filters import (
+    BaseFilter,
+    BatchPredicateFilter,
+    CompositeFilter,
+    HyperscanFilter,
+    PredicateFilter,
+    RegexFilter,
+)
+from log_interceptor.interceptor import (
+    BatchCallback,
+    InterceptorStats,
+    LineCallback,
+    LogEntry,
+    LogInterceptor,
+)
+
+__version__ = "0.1.0"
+
+__all__ = [
+    "BaseFilter",
+    "BatchCallback",
+    "BatchPredicateFilter",
+    "CompositeFilter",
+    "ConfigurationError",
+    "FileWatchError",
+    "FilterError",
+    "HyperscanFilter",
+    "InterceptorConfig",
+    "InterceptorStats",
+    "LineCallback",
+    "LogBufferError",
+    "LogEntry",
+    "LogInterceptor",
+    "LogInterceptorError",
+    "PredicateFilter",
+    "RegexFilter",
+    "__version__",
+]
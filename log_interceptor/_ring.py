@@ -0,0 +1,148 @@
+"""Single-producer ring buffer for captured lines."""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Sequence
+from typing import Any
+
+# push() drops references to out-of-view records in batches of this many.
+_RELEASE_BATCH = 64
+
+
+class SpscRing:
+    """Bounded FIFO of fixed-width records without locks.
+
+    Records are stored column-wise in preallocated columns whose length is
+    the smallest power of two above ``size``, so a slot is found by masking
+    a monotonically increasing index. Only the newest ``size`` records are
+    visible, which keeps the slot being written by :meth:`push` out of view.
+    :meth:`push` also drops, in small batches, the object references of
+    records that fell out of view, so at most ``size + 64`` objects per
+    column are kept alive whatever the capacity; the columns themselves
+    take up to twice ``size`` slots.
+
+    Exactly one thread may call :meth:`push`. Any thread may call
+    :meth:`snapshot`, :meth:`clear` and ``len()``: the producer only ever
+    writes ``_head`` and readers only ever write ``_tail``, and each of those
+    is a single attribute store under the GIL. A reader that is lapped by
+    the producer while copying drops the records it may have seen released
+    or overwritten. References to cleared records are dropped by the next
+    :meth:`push` or :meth:`release`.
+
+    Args:
+        size: Maximum number of visible records.
+        columns: One entry per value of a record: ``None`` for a list of
+            arbitrary objects, or an :mod:`array` typecode to store that
+            value unboxed (e.g. ``"d"`` for floats).
+    """
+
+    __slots__ = (
+        "_capacity",
+        "_columns",
+        "_head",
+        "_mask",
+        "_objects",
+        "_release_at",
+        "_released",
+        "_tail",
+        "size",
+    )
+
+    def __init__(self, size: int, columns: Sequence[str | None] = (None,)) -> None:
+        if size < 1:
+            msg = f"size must be >= 1, got {size}"
+            raise ValueError(msg)
+        self.size = size
+        self._capacity = 1 << size.bit_length()
+        self._mask = self._capacity - 1
+        self._columns: list[Any] = [
+            [None] * self._capacity
+            if typecode is None
+            else array(typecode, [0]) * self._capacity
+            for typecode in columns
+        ]
+        # Columns holding references, and the index below which their slots
+        # have been reset to None. Both are used by the producer only.
+        self._objects = [
+            column for column, typecode in zip(self._columns, columns) if typecode is None
+        ]
+        self._released = 0
+        self._release_at = size + _RELEASE_BATCH  # head that triggers release()
+        self._head = 0
+        self._tail = 0
+
+    def push(self, *values: Any) -> None:
+        """Append one record, evicting the oldest when full. Producer only."""
+        head = self._head
+        index = head & self._mask
+        for column, value in zip(self._columns, values):
+            column[index] = value
+        # Publish only after every column of the slot has been written.
+        self._head = head + 1
+        if head >= self._release_at:
+            self.release()
+
+    def release(self) -> None:
+        """Drop references held for records out of view. Producer only.
+
+        Also safe from any thread while no producer is running.
+        """
+        head = self._head
+        stop = max(head - self.size, self._tail)
+        released = self._released
+        if released >= stop:
+            return
+        # Records older than one lap behind head share their slots with
+        # newer ones, so only reset the slots that are not live.
+        released = max(released, head - self._capacity)
+        for column in self._objects:
+            self._fill(column, released, stop)
+        self._released = stop
+        self._release_at = stop + self.size + _RELEASE_BATCH
+
+    def snapshot(
+        self, last: int | None = None, columns: Sequence[int] | None = None
+    ) -> list[list[Any]]:
+        """Return the visible records, oldest first, as one list per column.
+
+        Args:
+            last: Copy only the ``last`` most recent records.
+            columns: Indices of the columns to copy; all by default.
+        """
+        head = self._head
+        start = max(self._tail, head - self.size)
+        if last is not None:
+            start = max(start, head - last)
+        selected = self._columns if columns is None else [self._columns[i] for i in columns]
+        copied = [self._copy(column, start, head) for column in selected]
+        # Records that went out of view or were cleared since ``head`` was
+        # read may have been released, and their slots even reused.
+        lapped = max(self._head - self.size, self._tail) - start
+        if lapped > 0:
+            copied = [column[lapped:] for column in copied]
+        return [column if isinstance(column, list) else column.tolist() for column in copied]
+
+    def clear(self) -> None:
+        """Hide all records pushed so far."""
+        self._tail = self._head
+
+    def __len__(self) -> int:
+        head = self._head
+        return head - max(self._tail, head - self.size)
+
+    def _fill(self, column: list[Any], start: int, stop: int) -> None:
+        first, last = start & self._mask, stop & self._mask
+        if first < last or start == stop:
+            column[first:last] = [None] * (last - first)
+        else:
+            column[first:] = [None] * (self._capacity - first)
+            column[:last] = [None] * last
+
+    def _copy(self, column: Any, start: int, stop: int) -> Any:
+        if start == stop:
+            return []
+        first, last = start & self._mask, stop & self._mask
+        if first < last:
+            return column[first:last]
+        return column[first:] + column[:last]
@@ -0,0 +1,204 @@
+"""Configuration for :class:`~log_interceptor.interceptor.LogInterceptor`."""
+
+from __future__ import annotations
+
+import codecs
+import dataclasses
+import functools
+import os
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from log_interceptor.exceptions import ConfigurationError
+
+ENV_PREFIX = "LOG_INTERCEPTOR_"
+
+_PRESETS: dict[str, dict[str, Any]] = {
+    "aggressive": {
+        "debounce_interval": 0.01,
+        "buffer_size": 100_000,
+        "retry_max_attempts": 5,
+        "retry_delay": 0.05,
+    },
+    "balanced": {},
+    "conservative": {
+        "debounce_interval": 0.5,
+        "buffer_size": 1_000,
+        "retry_max_attempts": 3,
+        "retry_delay": 0.5,
+    },
+}
+
+
+@dataclass(frozen=True)
+class InterceptorConfig:
+    """Immutable tuning parameters for a log interceptor.
+
+    Attributes:
+        debounce_interval: Seconds to coalesce bursts of file events before
+            reading the file.
+        adaptive_debounce: While the moving average of the gap between
+            events exceeds ``debounce_interval``, wait only 1 ms before
+            reading, so sparse writes are read promptly. Events are then
+            mostly handled one pass each; only those within that 1 ms are
+            coalesced. The full interval applies again once the average
+            drops below it, so the first events of a burst that follows a
+            quiet spell may still be read one by one.
+        poll_interval: When positive, stat the source file instead of
+            watching its directory for events, at most this many seconds
+            apart: polls follow each other quickly while data keeps arriving
+            and back off to this interval while the file is idle. Suits busy
+            directories, where unrelated files would wake the watcher, and
+            network filesystems that do not report events. ``0`` (default)
+            uses filesystem events.
+        buffer_size: Maximum number of lines kept in the in-memory buffer;
+            the oldest lines are dropped first. Dropped lines are released in
+            batches, so at most this many plus 64 lines are held in memory;
+            the buffer's slot arrays are preallocated to the next power of
+            two above it (three 8-byte slots per line).
+        encoding: Encoding of the source log file. It must encode newlines
+            as the single byte ``b"\n"``, so UTF-16 and UTF-32 are not
+            supported. For logs known to be pure ASCII, ``"ascii"`` or
+            ``"latin-1"`` decode fastest.
+        decode_errors: Codec error handler for undecodable bytes, e.g.
+            ``"replace"`` (default) or ``"ignore"``. ``"strict"`` is not
+            allowed, since one bad byte must not stop monitoring.
+        follow_rotations: After the file is rotated or truncated, read the
+            new file from its start. When ``False``, resume at its end.
+        retry_on_error: Retry reads that fail with an ``OSError``.
+        retry_max_attempts: Attempts per read when retrying is enabled.
+        retry_delay: Initial delay between attempts, doubled after each one.
+
+    Raises:
+        ConfigurationError: If a value is out of range.
+    """
+
+    debounce_interval: float = 0.1
+    adaptive_debounce: bool = True
+    poll_interval: float = 0.0
+    buffer_size: int = 10_000
+    encoding: str = "utf-8"
+    decode_errors: str = "replace"
+    follow_rotations: bool = True
+    retry_on_error: bool = True
+    retry_max_attempts: int = 3
+    retry_delay: float = 0.1
+
+    def __post_init__(self) -> None:
+        if self.debounce_interval < 0:
+            msg = f"debounce_interval must be >= 0, got {self.debounce_interval}"
+            raise ConfigurationError(msg)
+        if self.poll_interval < 0:
+            msg = f"poll_interval must be >= 0, got {self.poll_interval}"
+            raise ConfigurationError(msg)
+        if self.buffer_size < 1:
+            msg = f"buffer_size must be >= 1, got {self.buffer_size}"
+            raise ConfigurationError(msg)
+        if self.retry_max_attempts < 1:
+            msg = f"retry_max_attempts must be >= 1, got {self.retry_max_attempts}"
+            raise ConfigurationError(msg)
+        if self.retry_delay < 0:
+            msg = f"retry_delay must be >= 0, got {self.retry_delay}"
+            raise ConfigurationError(msg)
+        try:
+            encoder = codecs.getincrementalencoder(self.encoding)()
+            "".encode(self.encoding)
+        except LookupError as exc:
+            msg = f"Unknown encoding: {self.encoding!r}"
+            raise ConfigurationError(msg) from exc
+        # Lines are split on raw b"\n" bytes before decoding. Encode past
+        # any byte-order mark so that "utf-8-sig" still qualifies.
+        encoder.encode("x")
+        if encoder.encode("\n") != b"\n":
+            msg = f"encoding must write newlines as b'\\n', got {self.encoding!r}"
+            raise ConfigurationError(msg)
+        if self.decode_errors == "strict":
+            msg = "decode_errors must not be 'strict'"
+            raise ConfigurationError(msg)
+        try:
+            codecs.lookup_error(self.decode_errors)
+        except LookupError as exc:
+            msg = f"Unknown decode error handler: {self.decode_errors!r}"
+            raise ConfigurationError(msg) from exc
+
+    @classmethod
+    def from_preset(cls, preset: str, **overrides: Any) -> InterceptorConfig:
+        """Create a config from a named preset.
+
+        Configs are immutable, so results are cached and repeated calls with
+        the same arguments return the same instance.
+
+        Args:
+            preset: ``"aggressive"``, ``"balanced"`` or ``"conservative"``.
+            **overrides: Fields to override on top of the preset.
+
+        Raises:
+            ConfigurationError: If the preset or an override is unknown.
+        """
+        return _preset_config(cls, preset, tuple(sorted(overrides.items())))
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> InterceptorConfig:
+        """Create a config from a mapping of field names to values.
+
+        Raises:
+            ConfigurationError: If the mapping contains unknown keys.
+        """
+        unknown = set(data) - {field.name for field in dataclasses.fields(cls)}
+        if unknown:
+            msg = f"Unknown config options: {sorted(unknown)}"
+            raise ConfigurationError(msg)
+        return cls(**data)
+
+    @classmethod
+    def from_env(
+        cls, prefix: str = ENV_PREFIX, environ: Mapping[str, str] | None = None
+    ) -> InterceptorConfig:
+        """Create a config from environment variables.
+
+        Each field is read from ``<prefix><FIELD_NAME>``, e.g.
+        ``LOG_INTERCEPTOR_DEBOUNCE_INTERVAL=0.5``. Unset fields keep their
+        defaults.
+
+        Raises:
+            ConfigurationError: If a variable cannot be parsed.
+        """
+        env = os.environ if environ is None else environ
+        values: dict[str, Any] = {}
+        for field in dataclasses.fields(cls):
+            raw = env.get(prefix + field.name.upper())
+            if raw is not None:
+                values[field.name] = _parse_env_value(field.name, field.type, raw)
+        return cls(**values)
+
+
+@functools.lru_cache(maxsize=16)
+def _preset_config(
+    cls: type[InterceptorConfig], preset: str, overrides: tuple[tuple[str, Any], ...]
+) -> InterceptorConfig:
+    try:
+        values = _PRESETS[preset]
+    except KeyError:
+        msg = f"Unknown preset: {preset!r} (expected one of {sorted(_PRESETS)})"
+        raise ConfigurationError(msg) from None
+    return cls.from_dict({**values, **dict(overrides)})
+
+
+def _parse_env_value(name: str, type_name: Any, raw: str) -> Any:
+    try:
+        if type_name == "bool":
+            lowered = raw.strip().lower()
+            if lowered in ("1", "true", "yes", "on"):
+                return True
+            if lowered in ("0", "false", "no", "off"):
+                return False
+            raise ValueError(raw)
+        if type_name == "int":
+            return int(raw)
+        if type_name == "float":
+            return float(raw)
+    except ValueError as exc:
+        msg = f"Invalid value for {name}: {raw!r}"
+        raise ConfigurationError(msg) from exc
+    return raw
@@ -0,0 +1,30 @@
+"""Exception hierarchy for log_interceptor.
+
+All exceptions raised by the library derive from :class:`LogInterceptorError`,
+so callers can catch a single base class.
+"""
+
+from __future__ import annotations
+
+
+class LogInterceptorError(Exception):
+    """Base class for all log_interceptor errors."""
+
+
+class FileWatchError(LogInterceptorError):
+    """Raised when the source file cannot be watched or read."""
+
+
+class FilterError(LogInterceptorError):
+    """Raised when a filter is misconfigured or fails while evaluating a line."""
+
+
+class LogBufferError(LogInterceptorError):
+    """Raised on invalid in-memory buffer operations."""
+
+
+class ConfigurationError(LogInterceptorError, ValueError):
+    """Raised when an :class:`~log_interceptor.config.InterceptorConfig` is invalid.
+
+    Also a :class:`ValueError`, so generic validation handlers keep working.
+    """
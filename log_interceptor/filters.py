@@ -0,0 +1,1008 @@
+"""Content filters applied to captured log lines.
+
+A filter decides whether a single line (without its trailing newline) should
+be captured. Filters can be combined with :class:`CompositeFilter`; the
+interceptor itself treats its list of filters as an implicit AND.
+"""
+
+from __future__ import annotations
+
+import functools
+import itertools
+import re
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Sequence
+from typing import Any, ClassVar, Literal
+
+from log_interceptor.exceptions import FilterError
+
+try:
+    from re import _parser as _sre_parse  # type: ignore[attr-defined]  # Python 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse as _sre_parse  # type: ignore[no-redef]
+
+try:
+    import hyperscan
+except ImportError:  # optional dependency, see HyperscanFilter
+    hyperscan = None
+
+try:
+    import re2
+except ImportError:  # optional dependency, see RegexFilter(engine="re2")
+    re2 = None
+
+FilterMode = Literal["whitelist", "blacklist"]
+CompositeMode = Literal["AND", "OR"]
+RegexEngine = Literal["re", "re2"]
+
+_REGEX_META = frozenset(".^$*+?{}[]\\|()")
+
+# CompositeFilter evaluates every child on one line in this many (a power of
+# two) to learn pass rates, and re-ranks its children every few samples.
+_SAMPLE_EVERY = 64
+_RERANK_EVERY = 16
+_MAX_SAMPLES = 1024
+
+
+# Compiled patterns are shared by all filters, so equal patterns (e.g. the
+# same filter rebuilt on every config reload) are compiled once and reuse one
+# object. Bounded, so generated patterns cannot grow it without limit.
+@functools.lru_cache(maxsize=512)
+def _compile(pattern: str, flags: int) -> re.Pattern[str]:
+    return re.compile(pattern, flags)
+
+
+@functools.lru_cache(maxsize=512)
+def _compile_re2(pattern: str, case_sensitive: bool) -> Any:
+    if re2 is None:
+        msg = "engine='re2' requires the optional 'google-re2' package"
+        raise FilterError(msg)
+    try:
+        return re2.compile(pattern if case_sensitive else f"(?i){pattern}")
+    except re2.error as exc:
+        msg = f"Invalid regex pattern {pattern!r} for re2: {exc}"
+        raise FilterError(msg) from exc
+
+
+def _alternation(patterns: Sequence[str]) -> str:
+    return "|".join(f"(?:{p})" for p in patterns)
+
+
+def _literal_needles(pattern: str) -> tuple[str, ...] | None:
+    """Return the fixed strings ``pattern`` is an alternation of, if any.
+
+    Recognizes plain or :func:`re.escape`-d literals (``"ERROR"``), bare
+    alternations (``"ERROR|WARNING"``) and the output of :func:`_alternation`.
+    Anything containing an unescaped regex metacharacter returns ``None``.
+    """
+    needles = []
+    for part in pattern.split("|"):
+        if part.startswith("(?:") and part.endswith(")"):
+            part = part[3:-1]
+        needle = _unescape_literal(part)
+        if not needle:
+            return None
+        needles.append(needle)
+    return tuple(needles)
+
+
+def _unescape_literal(part: str) -> str | None:
+    """Return the fixed string ``part`` matches, or ``None`` if it is a regex.
+
+    Backslash-escaped punctuation, as produced by :func:`re.escape`, counts
+    as literal; escapes such as ``\\d`` and any other metacharacter do not.
+    """
+    if "\\" not in part:
+        return part if _REGEX_META.isdisjoint(part) else None
+    chars = []
+    escaped = False
+    for char in part:
+        if escaped:
+            if char.isascii() and char.isalnum():
+                return None
+            chars.append(char)
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char in _REGEX_META:
+            return None
+        else:
+            chars.append(char)
+    return None if escaped else "".join(chars)
+
+
+def _anchored_needles(pattern: str) -> tuple[str, tuple[str, ...]] | None:
+    """Return ``("^", needles)`` or ``("$", needles)`` for anchored literals.
+
+    Recognizes alternations whose every branch is a literal anchored at the
+    same end, such as ``"^ERROR"`` or ``"^ERROR|^WARN"`` and ``"done$"``.
+    Anything else, including literals anchored at both ends, returns ``None``.
+    """
+    anchor = ""
+    needles: list[str] = []
+    for part in pattern.split("|"):
+        if part.startswith("(?:") and part.endswith(")"):
+            part = part[3:-1]
+        if part.startswith("^") and anchor != "$":
+            anchor, part = "^", part[1:]
+        elif part.endswith("$") and anchor != "^":
+            anchor, part = "$", part[:-1]
+        else:
+            return None
+        needle = _unescape_literal(part)
+        if not needle:
+            return None
+        needles.append(needle)
+    return (anchor, tuple(needles)) if anchor else None
+
+
+def _literal_runs(items: Any, runs: list[str], run: list[str]) -> list[str]:
+    for op, arg in items:
+        if op is _sre_parse.LITERAL:
+            run.append(chr(arg))
+            continue
+        if op is _sre_parse.SUBPATTERN and not arg[1] & _sre_parse.SRE_FLAG_IGNORECASE:
+            run = _literal_runs(arg[3], runs, run)
+            continue
+        if run:
+            runs.append("".join(run))
+        run = []
+    return run
+
+
+@functools.lru_cache(maxsize=512)  # parsed once per pattern, like _compile
+def _required_literal(pattern: str) -> str | None:
+    """Return the longest fixed string every match of ``pattern`` contains.
+
+    Only literals on the top-level path of the pattern (possibly inside
+    groups) count; anything under a repeat, branch or class is skipped.
+    Returns ``None`` if there is no such string of at least two characters,
+    or if the pattern ignores case.
+    """
+    try:
+        parsed = _sre_parse.parse(pattern)
+    except (re.error, RecursionError):
+        return None
+    if parsed.state.flags & _sre_parse.SRE_FLAG_IGNORECASE:
+        return None
+    runs: list[str] = []
+    last = _literal_runs(parsed, runs, [])
+    if last:
+        runs.append("".join(last))
+    best = max(runs, key=len, default="")
+    return best if len(best) >= 2 else None
+
+
+class BaseFilter(ABC):
+    """Abstract base class for line filters.
+
+    Attributes:
+        cost: Relative per-line evaluation cost, used by
+            :class:`CompositeFilter` to run cheap filters first. Subclasses
+            may override it; unknown filters are assumed to be expensive.
+
+    The built-in filters use ``__slots__``.
+    """
+
+    __slots__ = ("__weakref__",)
+
+    cost: float = 4.0
+
+    @abstractmethod
+    def filter(self, line: str) -> bool:
+        """Return ``True`` if ``line`` should be captured."""
+
+    def filter_lines(self, lines: list[str]) -> list[str]:
+        """Return the lines of ``lines`` that :meth:`filter` accepts, in order.
+
+        Subclasses override this to evaluate a whole batch without a Python
+        call per line.
+        """
+        return list(filter(self.filter, lines))
+
+    def __call__(self, line: str) -> bool:
+        return self.filter(line)
+
+    def required_literals(self) -> tuple[str, ...] | None:
+        """Return strings of which every accepted line contains at least one.
+
+        Used to build a chunk-level prefilter (see :func:`build_prefilter`).
+        ``None`` means the filter gives no such guarantee, which is always a
+        safe answer for custom filters.
+        """
+        return None
+
+
+class _SpecializedFilter(BaseFilter):
+    """Base for filters that pick a per-line matcher at construction.
+
+    The matcher, specialized for the filter's configuration, is kept in
+    ``_match`` and :meth:`filter` delegates to it, so subclasses may still
+    override :meth:`filter`. Internal callers go through :func:`_matcher`,
+    which calls ``_match`` directly unless :meth:`filter` is overridden.
+    """
+
+    __slots__ = ("_match",)
+
+    _match: Callable[[str], bool]
+
+    def filter(self, line: str) -> bool:
+        return self._match(line)
+
+    def filter_lines(self, lines: list[str]) -> list[str]:
+        return list(filter(_matcher(self), lines))
+
+
+def _matcher(f: BaseFilter) -> Callable[[str], bool]:
+    """Return the fastest callable equivalent to ``f.filter``."""
+    if type(f).filter is _SpecializedFilter.filter:
+        return f._match  # type: ignore[attr-defined]
+    return f.filter
+
+
+class RegexFilter(_SpecializedFilter):
+    """Filter lines by a regular expression.
+
+    Args:
+        pattern: Regular expression, searched anywhere in the line. Fixed
+            strings and alternations of them, escaped with :func:`re.escape`
+            or not, are found with a plain substring search instead.
+        mode: ``"whitelist"`` keeps matching lines, ``"blacklist"`` drops them.
+        case_sensitive: Match case-sensitively (default) or ignore case.
+        engine: ``"re"`` (default) or ``"re2"`` to search with the optional
+            ``google-re2`` package, whose automaton-based matching runs in
+            time linear in the line length whatever the pattern. RE2 does not
+            support backreferences or lookaround.
+
+    Raises:
+        FilterError: If ``mode`` or ``engine`` is unknown, ``pattern`` does not
+            compile, or ``engine="re2"`` is requested without ``google-re2``.
+    """
+
+    __slots__ = (
+        "_folded",
+        "_needle",
+        "_needles",
+        "_prefixes",
+        "_required",
+        "_search",
+        "_suffixes",
+        "case_sensitive",
+        "cost",
+        "engine",
+        "mode",
+        "pattern",
+    )
+
+    def __init__(
+        self,
+        pattern: str,
+        mode: FilterMode = "whitelist",
+        *,
+        case_sensitive: bool = True,
+        engine: RegexEngine = "re",
+    ) -> None:
+        if mode not in ("whitelist", "blacklist"):
+            msg = f"Invalid filter mode: {mode!r} (expected 'whitelist' or 'blacklist')"
+            raise FilterError(msg)
+        if engine not in ("re", "re2"):
+            msg = f"Invalid regex engine: {engine!r} (expected 're' or 're2')"
+            raise FilterError(msg)
+        if engine == "re2":
+            self.pattern: re.Pattern[str] = _compile_re2(pattern, case_sensitive)
+        else:
+            flags = 0 if case_sensitive else re.IGNORECASE
+            try:
+                self.pattern = _compile(pattern, flags)
+            except re.error as exc:
+                msg = f"Invalid regex pattern {pattern!r}: {exc}"
+                raise FilterError(msg) from exc
+        self.mode: FilterMode = mode
+        self.case_sensitive = case_sensitive
+        self.engine: RegexEngine = engine
+        # Fixed-string patterns skip the regex engine: ``in`` is a C-level
+        # substring search. Case-insensitive ASCII literals are compared
+        # against the lowercased line, but only for ASCII lines: Unicode case
+        # folding (e.g. "ſ" matching "s") keeps ``re`` semantics.
+        self._needles = _literal_needles(pattern) if case_sensitive else None
+        self._folded: tuple[str, ...] | None = None
+        if not case_sensitive and pattern.isascii():
+            folded = _literal_needles(pattern)
+            if folded is not None:
+                self._folded = tuple(needle.lower() for needle in folded)
+        # Literals anchored at the start or end of the line map onto
+        # str.startswith/endswith. ``$`` also matches before a trailing
+        # newline, so each suffix is accepted with one too.
+        self._prefixes: tuple[str, ...] | None = None
+        self._suffixes: tuple[str, ...] | None = None
+        anchored = _anchored_needles(pattern) if case_sensitive else None
+        if anchored is not None:
+            anchor, needles = anchored
+            if anchor == "^":
+                self._prefixes = needles
+            else:
+                self._suffixes = needles + tuple(needle + "\n" for needle in needles)
+        literal = (
+            self._needles is not None
+            or self._folded is not None
+            or self._prefixes is not None
+            or self._suffixes is not None
+        )
+        # Other case-sensitive patterns often still require a fixed string
+        # (e.g. "ERROR" in r"ERROR \d+"); lines without it skip the search.
+        self._required = None if literal or not case_sensitive else _required_literal(pattern)
+        self.cost = 2.0 if literal else 3.0 if self._required is not None else 4.0
+        # Resolve the mode and matching strategy once instead of per line.
+        self._search = self.pattern.search
+        if self._folded is not None:
+            white, black = self._folded_white, self._folded_black
+        elif self._prefixes is not None:
+            white, black = self._prefix_white, self._prefix_black
+        elif self._suffixes is not None:
+            white, black = self._suffix_white, self._suffix_black
+        elif self._required is not None:
+            white, black = self._guarded_white, self._guarded_black
+        elif self._needles is None:
+            white, black = self._search_white, self._search_black
+        elif len(self._needles) == 1:
+            self._needle = self._needles[0]
+            white, black = self._contains_white, self._contains_black
+        else:
+            white, black = self._any_white, self._any_black
+        self._match = white if mode == "whitelist" else black
+
+    @classmethod
+    def union(
+        cls,
+        *patterns: str,
+        mode: FilterMode = "whitelist",
+        case_sensitive: bool = True,
+        engine: RegexEngine = "re",
+    ) -> RegexFilter:
+        """Build one filter that matches if any of ``patterns`` matches.
+
+        The alternation is compiled once, so each line costs a single regex
+        search instead of one search per pattern.
+
+        Raises:
+            FilterError: If no patterns are given or the union does not compile.
+        """
+        if not patterns:
+            msg = "RegexFilter.union() requires at least one pattern"
+            raise FilterError(msg)
+        return cls(_alternation(patterns), mode, case_sensitive=case_sensitive, engine=engine)
+
+    def required_literals(self) -> tuple[str, ...] | None:
+        if self.mode != "whitelist":
+            return None
+        if self._required is not None:
+            return (self._required,)
+        if self._prefixes is not None:
+            return self._prefixes
+        if self._suffixes is not None:
+            return self._suffixes[: len(self._suffixes) // 2]
+        return self._needles
+
+    def filter_lines(self, lines: list[str]) -> list[str]:
+        if type(self).filter is not _SpecializedFilter.filter:
+            return super().filter_lines(lines)  # honour an overridden filter()
+        keep = self.mode == "whitelist"
+        search = self._search
+        if self._required is not None:
+            required = self._required
+            if keep:
+                return [line for line in lines if required in line and search(line)]
+            return [line for line in lines if required not in line or not search(line)]
+        if self._prefixes is not None:
+            prefixes = self._prefixes
+            if keep:
+                return [line for line in lines if line.startswith(prefixes)]
+            return [line for line in lines if not line.startswith(prefixes)]
+        if self._suffixes is not None:
+            suffixes = self._suffixes
+            if keep:
+                return [line for line in lines if line.endswith(suffixes)]
+            return [line for line in lines if not line.endswith(suffixes)]
+        if self._needles is not None and len(self._needles) == 1:
+            needle = self._needle
+            if keep:
+                return [line for line in lines if needle in line]
+            return [line for line in lines if needle not in line]
+        if self._needles is None and self._folded is None:
+            # Match objects are truthy, so the search itself is the predicate
+            # and the loop stays in C.
+            return list(filter(search, lines) if keep else itertools.filterfalse(search, lines))
+        return super().filter_lines(lines)
+
+    def _search_white(self, line: str) -> bool:
+        return self._search(line) is not None
+
+    def _search_black(self, line: str) -> bool:
+        return self._search(line) is None
+
+    def _guarded_white(self, line: str) -> bool:
+        return self._required in line and self._search(line) is not None  # type: ignore[operator]
+
+    def _guarded_black(self, line: str) -> bool:
+        return self._required not in line or self._search(line) is None  # type: ignore[operator]
+
+    def _prefix_white(self, line: str) -> bool:
+        return line.startswith(self._prefixes)  # type: ignore[arg-type]
+
+    def _prefix_black(self, line: str) -> bool:
+        return not line.startswith(self._prefixes)  # type: ignore[arg-type]
+
+    def _suffix_white(self, line: str) -> bool:
+        return line.endswith(self._suffixes)  # type: ignore[arg-type]
+
+    def _suffix_black(self, line: str) -> bool:
+        return not line.endswith(self._suffixes)  # type: ignore[arg-type]
+
+    def _contains_white(self, line: str) -> bool:
+        return self._needle in line
+
+    def _contains_black(self, line: str) -> bool:
+        return self._needle not in line
+
+    def _folded_match(self, line: str) -> bool:
+        if line.isascii():
+            lowered = line.lower()
+            return any(needle in lowered for needle in self._folded)  # type: ignore[union-attr]
+        return self._search(line) is not None
+
+    def _folded_white(self, line: str) -> bool:
+        return self._folded_match(line)
+
+    def _folded_black(self, line: str) -> bool:
+        return not self._folded_match(line)
+
+    def _any_white(self, line: str) -> bool:
+        return any(needle in line for needle in self._needles)  # type: ignore[union-attr]
+
+    def _any_black(self, line: str) -> bool:
+        return not any(needle in line for needle in self._needles)  # type: ignore[union-attr]
+
+    def __repr__(self) -> str:
+        return f"RegexFilter({self.pattern.pattern!r}, mode={self.mode!r})"
+
+
+def _halt_scan(*_args: Any) -> bool:
+    return True  # stop at the first match; the scan raises ScanTerminated
+
+
+class HyperscanFilter(_SpecializedFilter):
+    """Filter lines by several regular expressions scanned in a single pass.
+
+    A line matches if any of ``patterns`` matches it. With the optional
+    ``hyperscan`` package installed, all patterns are compiled into one
+    Hyperscan database and each line is scanned once, in time linear in its
+    length. Without it, or when a pattern uses a feature Hyperscan does not
+    support (e.g. backreferences), the filter falls back to ``re``: one
+    compiled alternation when the patterns can be merged, as in
+    :class:`CompositeFilter`, otherwise each pattern in turn.
+
+    Args:
+        *patterns: Regular expressions, searched anywhere in the line.
+        mode: ``"whitelist"`` keeps matching lines, ``"blacklist"`` drops them.
+        case_sensitive: Match case-sensitively (default) or ignore case.
+
+    Raises:
+        FilterError: If no patterns are given, ``mode`` is unknown or a
+            pattern does not compile.
+    """
+
+    __slots__ = (
+        "_fallback",
+        "_scan",
+        "case_sensitive",
+        "mode",
+        "patterns",
+    )
+
+    cost = 3.0
+
+    def __init__(
+        self,
+        *patterns: str,
+        mode: FilterMode = "whitelist",
+        case_sensitive: bool = True,
+    ) -> None:
+        if not patterns:
+            msg = "HyperscanFilter requires at least one pattern"
+            raise FilterError(msg)
+        regexes = [RegexFilter(p, mode, case_sensitive=case_sensitive) for p in patterns]
+        self._fallback: BaseFilter = (
+            regexes[0]
+            if len(regexes) == 1
+            else CompositeFilter(regexes, "OR" if mode == "whitelist" else "AND")
+        )
+        self.patterns = patterns
+        self.mode: FilterMode = mode
+        self.case_sensitive = case_sensitive
+        fallback = _matcher(self._fallback)
+        # Lines Hyperscan cannot take (lone surrogates from "surrogateescape"
+        # decoding are not UTF-8) are answered by the ``re`` fallback.
+        self._scan = matches = self._compile_matcher(
+            fallback if mode == "whitelist" else lambda line: not fallback(line)
+        )
+        if matches is None:
+            self._match = fallback
+        elif mode == "whitelist":
+            self._match = matches
+        else:
+            self._match = lambda line: not matches(line)
+
+    @property
+    def uses_hyperscan(self) -> bool:
+        """Whether lines are scanned by Hyperscan rather than ``re``."""
+        return self._scan is not None
+
+    def _compile_matcher(
+        self, unencodable: Callable[[str], bool]
+    ) -> Callable[[str], bool] | None:
+        """Return a function telling whether any pattern matches a line.
+
+        ``unencodable`` answers the same question for lines that cannot be
+        encoded as UTF-8.
+        """
+        if hyperscan is None:
+            return None
+        hs = hyperscan
+        flags = hs.HS_FLAG_SINGLEMATCH | hs.HS_FLAG_UTF8 | hs.HS_FLAG_UCP
+        if not self.case_sensitive:
+            flags |= hs.HS_FLAG_CASELESS
+        database = hs.Database()
+        try:
+            database.compile(
+                expressions=[p.encode("utf-8") for p in self.patterns],
+                ids=list(range(len(self.patterns))),
+                elements=len(self.patterns),
+                flags=flags,
+            )
+        except hs.error:
+            return None
+        # Scratch space may not be shared by concurrent scans.
+        local = threading.local()
+
+        def matches(line: str) -> bool:
+            scratch = getattr(local, "scratch", None)
+            if scratch is None:
+                scratch = local.scratch = hs.Scratch(database)
+            try:
+                data = line.encode("utf-8")
+            except UnicodeEncodeError:
+                return unencodable(line)
+            try:
+                database.scan(data, match_event_handler=_halt_scan, scratch=scratch)
+            except hs.ScanTerminated:
+                return True
+            return False
+
+        return matches
+
+    def required_literals(self) -> tuple[str, ...] | None:
+        return self._fallback.required_literals()
+
+    def __repr__(self) -> str:
+        args = ", ".join(repr(p) for p in self.patterns)
+        return f"HyperscanFilter({args}, mode={self.mode!r})"
+
+
+def _always_true(line: str) -> bool:
+    return True
+
+
+def _always_false(line: str) -> bool:
+    return False
+
+
+class PredicateFilter(BaseFilter):
+    """Filter lines with an arbitrary predicate function.
+
+    :attr:`TRUE` and :attr:`FALSE` accept and reject every line; a
+    :class:`CompositeFilter` folds them away instead of calling them.
+
+    Args:
+        predicate: Callable returning ``True`` for lines to capture.
+        cache_size: Remember the results for up to this many distinct lines
+            (least recently used first out), so repeated lines such as
+            heartbeats skip the call. Only for predicates that depend on
+            nothing but the line. ``0`` (default) disables the cache.
+
+    Raises:
+        FilterError: If ``cache_size`` is negative, or from :meth:`filter` if
+            the predicate raises.
+    """
+
+    __slots__ = ("_call", "predicate")
+
+    cost = 1.0
+    TRUE: ClassVar[PredicateFilter]
+    FALSE: ClassVar[PredicateFilter]
+
+    def __init__(self, predicate: Callable[[str], bool], *, cache_size: int = 0) -> None:
+        if not callable(predicate):
+            msg = f"Predicate must be callable, got {type(predicate).__name__}"
+            raise FilterError(msg)
+        if cache_size < 0:
+            msg = f"cache_size must be >= 0, got {cache_size}"
+            raise FilterError(msg)
+        self.predicate = predicate
+        self._call = functools.lru_cache(maxsize=cache_size)(predicate) if cache_size else predicate
+
+    def filter(self, line: str) -> bool:
+        try:
+            return bool(self._call(line))
+        except Exception as exc:
+            msg = f"Predicate {self.predicate!r} failed on line {line!r}"
+            raise FilterError(msg) from exc
+
+    def __repr__(self) -> str:
+        return f"PredicateFilter({self.predicate!r})"
+
+
+PredicateFilter.TRUE = PredicateFilter(_always_true)
+PredicateFilter.FALSE = PredicateFilter(_always_false)
+
+
+class BatchPredicateFilter(BaseFilter):
+    """Filter lines with a predicate evaluated over a whole batch at once.
+
+    ``predicate`` receives a list of lines and returns one truth value per
+    line, e.g. a NumPy boolean mask. The interceptor hands it every batch of
+    lines read together, so vectorized or JIT-compiled code (NumPy, Numba)
+    runs once per batch instead of once per line. Single lines passed to
+    :meth:`filter` are evaluated as a batch of one.
+
+    Args:
+        predicate: Callable mapping a list of lines to a sequence of the same
+            length, truthy for lines to capture.
+
+    Raises:
+        FilterError: From :meth:`filter` and :meth:`filter_lines` if the
+            predicate raises or returns the wrong number of values.
+    """
+
+    __slots__ = ("predicate",)
+
+    cost = 1.0
+
+    def __init__(self, predicate: Callable[[list[str]], Sequence[Any]]) -> None:
+        if not callable(predicate):
+            msg = f"Predicate must be callable, got {type(predicate).__name__}"
+            raise FilterError(msg)
+        self.predicate = predicate
+
+    def filter(self, line: str) -> bool:
+        return bool(self._mask([line])[0])
+
+    def filter_lines(self, lines: list[str]) -> list[str]:
+        if not lines:
+            return []
+        return list(itertools.compress(lines, self._mask(lines)))
+
+    def _mask(self, lines: list[str]) -> Sequence[Any]:
+        try:
+            mask = self.predicate(lines)
+            size = len(mask)
+        except Exception as exc:
+            msg = f"Predicate {self.predicate!r} failed on {len(lines)} line(s)"
+            raise FilterError(msg) from exc
+        if size != len(lines):
+            msg = f"Predicate {self.predicate!r} returned {size} values for {len(lines)} lines"
+            raise FilterError(msg)
+        return mask
+
+    def __repr__(self) -> str:
+        return f"BatchPredicateFilter({self.predicate!r})"
+
+
+class CompositeFilter(_SpecializedFilter):
+    """Combine several filters with AND or OR logic.
+
+    Evaluation short-circuits per line: in ``"AND"`` mode it stops at the
+    first filter that rejects the line, in ``"OR"`` mode at the first one
+    that accepts it. Filters are therefore reordered by their static
+    :attr:`~BaseFilter.cost` — predicates first, then literal regexes, then
+    other regexes — keeping the given order among equal costs. While
+    running, one line in 64 is evaluated against every child to measure how
+    often each one passes, and children are re-ranked by cost per decided
+    line: filters that are cheap and reject often run first under ``"AND"``,
+    cheap ones that accept often run first under ``"OR"``. Pass
+    ``reorder=False`` when a filter relies on an earlier one having run
+    (e.g. a predicate that only parses lines a regex has already matched).
+    Duplicate regex filters are dropped either way.
+
+    When every child is a :class:`RegexFilter` that can be merged (whitelists
+    under ``"OR"``, blacklists under ``"AND"``), the composite is fused into
+    one compiled alternation and each line is searched only once.
+
+    :attr:`PredicateFilter.TRUE` and :attr:`PredicateFilter.FALSE` children
+    are resolved up front: one that cannot change the result is dropped, and
+    one that decides it replaces all the others.
+
+    An empty ``"AND"`` composite accepts every line, an empty ``"OR"``
+    composite rejects every line.
+
+    Args:
+        filters: Filters to combine.
+        mode: ``"AND"`` (all must accept) or ``"OR"`` (any must accept).
+        reorder: Sort filters by cost and re-rank them by pass rate
+            (default). When ``False``, filters are evaluated in the given
+            order.
+
+    Raises:
+        FilterError: If ``mode`` is unknown.
+    """
+
+    __slots__ = (
+        "_evaluate",
+        "_fns",
+        "_fused",
+        "_lines",
+        "_passes",
+        "_samples",
+        "cost",
+        "filters",
+        "mode",
+    )
+
+    def __init__(
+        self,
+        filters: Sequence[BaseFilter],
+        mode: CompositeMode = "AND",
+        *,
+        reorder: bool = True,
+    ) -> None:
+        if mode not in ("AND", "OR"):
+            msg = f"Invalid composite mode: {mode!r} (expected 'AND' or 'OR')"
+            raise FilterError(msg)
+        filters = _drop_duplicates(_fold_constants(filters, mode))
+        self.filters: list[BaseFilter] = (
+            sorted(filters, key=lambda f: f.cost) if reorder else filters
+        )
+        self.mode: CompositeMode = mode
+        self._fused = self._fuse()
+        if self._fused is not None:
+            self.cost = self._fused.cost
+            self._match = _matcher(self._fused)
+        else:
+            self.cost = sum(f.cost for f in self.filters)
+            # Bound once so a line costs one call per child, not a lookup too.
+            self._fns = tuple(_matcher(f) for f in self.filters)
+            self._evaluate = self._all if mode == "AND" else self._any
+            if reorder and len(self.filters) > 1:
+                self._lines = 0
+                self._samples = 0
+                self._passes = [0] * len(self.filters)
+                self._match = self._adaptive
+            else:
+                self._match = self._evaluate
+
+    def _fuse(self) -> RegexFilter | None:
+        """Collapse an all-regex composite into a single alternation.
+
+        ``OR`` over whitelist regexes is a whitelist of the union, and ``AND``
+        over blacklist regexes is a blacklist of the union. Patterns with
+        capturing groups are left alone, since renumbering would break
+        backreferences.
+        """
+        regexes = [f for f in self.filters if type(f) is RegexFilter]
+        if len(regexes) < 2 or len(regexes) != len(self.filters):
+            return None
+        wanted: FilterMode = "whitelist" if self.mode == "OR" else "blacklist"
+        first = regexes[0]
+        if any(
+            f.mode != wanted
+            or f.case_sensitive != first.case_sensitive
+            or f.engine != first.engine
+            or f.pattern.groups
+            for f in regexes
+        ):
+            return None
+        try:
+            return RegexFilter.union(
+                *(f.pattern.pattern for f in regexes),
+                mode=wanted,
+                case_sensitive=first.case_sensitive,
+                engine=first.engine,
+            )
+        except FilterError:
+            return None
+
+    def compile(self) -> BaseFilter:
+        """Return an equivalent filter that scans each line only once.
+
+        An ``"OR"`` composite of whitelist :class:`RegexFilter` children, or
+        an ``"AND"`` composite of blacklist ones, all with the same case
+        sensitivity and the default ``"re"`` engine, becomes a
+        :class:`HyperscanFilter` over their patterns (a line is dropped if any
+        blacklist pattern matches it). Any other composite is returned
+        unchanged; ``"re2"`` children keep their linear-time engine.
+        """
+        mode: FilterMode = "whitelist" if self.mode == "OR" else "blacklist"
+        if not self.filters or any(
+            type(f) is not RegexFilter or f.mode != mode or f.engine != "re"
+            for f in self.filters
+        ):
+            return self
+        regexes: list[RegexFilter] = self.filters  # type: ignore[assignment]
+        case_sensitive = regexes[0].case_sensitive
+        if any(f.case_sensitive != case_sensitive for f in regexes):
+            return self
+        return HyperscanFilter(
+            *(f.pattern.pattern for f in regexes), mode=mode, case_sensitive=case_sensitive
+        )
+
+    def required_literals(self) -> tuple[str, ...] | None:
+        if self._fused is not None:
+            return self._fused.required_literals()
+        if self.mode == "AND":
+            return _narrowest_literals(self.filters)
+        union: list[str] = []
+        for f in self.filters:
+            literals = f.required_literals()
+            if literals is None:
+                return None
+            union.extend(literals)
+        return tuple(union) or None
+
+    def filter_lines(self, lines: list[str]) -> list[str]:
+        """Return the accepted ``lines``, evaluating one child at a time.
+
+        Under ``"AND"`` each child filters the lines the previous ones kept,
+        through its own :meth:`~BaseFilter.filter_lines`. Lines that would
+        have been sampled one at a time are sampled here as well.
+        """
+        if type(self).filter is not _SpecializedFilter.filter:
+            return super().filter_lines(lines)  # honour an overridden filter()
+        if self._fused is not None:
+            return self._fused.filter_lines(lines)
+        if self.mode == "OR":
+            return super().filter_lines(lines)
+        if self._match == self._adaptive:
+            first = (-self._lines - 1) & (_SAMPLE_EVERY - 1)
+            self._lines += len(lines)
+            for line in lines[first::_SAMPLE_EVERY]:
+                self._sample(line)
+        for f in self.filters:
+            if not lines:
+                break
+            lines = f.filter_lines(lines)
+        return lines
+
+    def _all(self, line: str) -> bool:
+        for fn in self._fns:
+            if not fn(line):
+                return False
+        return True
+
+    def _any(self, line: str) -> bool:
+        for fn in self._fns:
+            if fn(line):
+                return True
+        return False
+
+    def _adaptive(self, line: str) -> bool:
+        self._lines += 1
+        if self._lines & (_SAMPLE_EVERY - 1):
+            return self._evaluate(line)
+        return self._sample(line)
+
+    def _sample(self, line: str) -> bool:
+        """Evaluate every child on ``line``, recording which ones pass.
+
+        Children after the one that decides the line are evaluated only for
+        the statistics, so their errors are ignored and counted as the
+        non-decisive outcome, which keeps a failing child ranked late.
+        """
+        decisive = self.mode == "OR"
+        decided = False
+        passes = self._passes
+        for i, fn in enumerate(self._fns):
+            if decided:
+                try:
+                    passed = fn(line)
+                except Exception:
+                    passed = not decisive
+            else:
+                passed = fn(line)
+                decided = bool(passed) is decisive
+            if passed:
+                passes[i] += 1
+        self._samples += 1
+        if self._samples % _RERANK_EVERY == 0:
+            self._rerank()
+        return decisive if decided else not decisive
+
+    def _rerank(self) -> None:
+        """Order children by expected cost per line they decide."""
+        samples, passes = self._samples, self._passes
+
+        def rank(i: int) -> float:
+            rate = (passes[i] + 1) / (samples + 2)
+            return self.filters[i].cost / (rate if self.mode == "OR" else 1 - rate)
+
+        order = sorted(range(len(self.filters)), key=rank)
+        if samples >= _MAX_SAMPLES:
+            # Halve the history so the ranking follows changes in the log.
+            self._samples = samples // 2
+            passes = [count // 2 for count in passes]
+        self.filters = [self.filters[i] for i in order]
+        self._fns = tuple(self._fns[i] for i in order)
+        self._passes = [passes[i] for i in order]
+
+    def __repr__(self) -> str:
+        return f"CompositeFilter({self.filters!r}, mode={self.mode!r})"
+
+
+def _fold_constants(filters: Sequence[BaseFilter], mode: CompositeMode) -> list[BaseFilter]:
+    """Drop constant predicates that cannot change the result of ``mode``.
+
+    A constant that decides the result on its own is returned alone.
+    """
+    decisive = _always_false if mode == "AND" else _always_true
+    folded = []
+    for f in filters:
+        if type(f) is PredicateFilter and f.predicate in (_always_true, _always_false):
+            if f.predicate is decisive:
+                return [f]
+            continue
+        folded.append(f)
+    return folded
+
+
+def _drop_duplicates(filters: Sequence[BaseFilter]) -> list[BaseFilter]:
+    """Drop later copies of identical regex filters, keeping the order."""
+    seen: set[tuple[str, bool, str, str]] = set()
+    unique: list[BaseFilter] = []
+    for f in filters:
+        if type(f) is RegexFilter:
+            key = (f.pattern.pattern, f.case_sensitive, f.engine, f.mode)
+            if key in seen:
+                continue
+            seen.add(key)
+        unique.append(f)
+    return unique
+
+
+def _narrowest_literals(filters: Sequence[BaseFilter]) -> tuple[str, ...] | None:
+    """Pick the smallest literal set among AND-combined ``filters``."""
+    best: tuple[str, ...] | None = None
+    for f in filters:
+        literals = f.required_literals()
+        if literals is not None and (best is None or len(literals) < len(best)):
+            best = literals
+    return best
+
+
+# Decode error handlers that only ever substitute U+FFFD or lone surrogates
+# for bad bytes. Others can make a literal appear that is not in the raw
+# bytes, e.g. "ignore" decodes b"ER\xffROR" to "ERROR".
+_PREFILTER_SAFE_ERRORS = frozenset({"strict", "replace", "surrogateescape"})
+
+
+def build_prefilter(
+    filters: Sequence[BaseFilter], encoding: str = "utf-8", errors: str = "replace"
+) -> re.Pattern[bytes] | None:
+    """Compile a byte-level prefilter for AND-combined ``filters``.
+
+    The returned pattern matches any raw chunk that may contain an accepted
+    line; a chunk it does not match can be discarded without decoding or
+    splitting it. Returns ``None`` when no filter guarantees a literal, the
+    encoding is not ASCII-compatible or the ``errors`` handler may rewrite
+    undecodable bytes into text (so byte search would be unreliable).
+    """
+    if errors not in _PREFILTER_SAFE_ERRORS:
+        return None
+    literals = _narrowest_literals(filters)
+    if literals is None or any("\ufffd" in literal for literal in literals):
+        return None
+    try:
+        if "\n".encode(encoding) != b"\n":
+            return None
+        needles = [literal.encode(encoding) for literal in literals]
+    except (LookupError, UnicodeEncodeError):
+        return None
+    return re.compile(b"|".join(re.escape(needle) for needle in needles))
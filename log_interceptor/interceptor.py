@@ -0,0 +1,897 @@
+"""Non-blocking interception of lines appended to an external log file."""
+
+from __future__ import annotations
+
+import collections
+import contextlib
+import logging
+import os
+import queue
+import threading
+import time
+from collections.abc import Callable, Sequence
+from io import FileIO
+from pathlib import Path
+from types import TracebackType
+from typing import Any, NamedTuple, TypedDict
+
+from watchdog.events import FileSystemEvent, FileSystemEventHandler
+from watchdog.observers import Observer
+
+from log_interceptor._ring import SpscRing
+from log_interceptor.config import InterceptorConfig
+from log_interceptor.exceptions import FileWatchError, LogBufferError
+from log_interceptor.filters import BaseFilter, CompositeFilter, build_prefilter
+
+logger = logging.getLogger(__name__)
+
+_READ_CHUNK_SIZE = 64 * 1024
+_TARGET_FLAGS = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+# Shortest debounce used when events are too sparse to be worth coalescing.
+_MIN_DEBOUNCE = 0.001
+# Weight of the newest gap in the moving average of gaps between events.
+_EVENT_GAP_WEIGHT = 0.2
+# Polling delay right after a poll that found new data.
+_MIN_POLL_INTERVAL = 0.001
+# Windows handles opened without FILE_SHARE_DELETE (as Python opens them)
+# keep the writer from renaming or deleting the file, i.e. from rotating it,
+# so there the source and target are closed again after every pass.
+_KEEP_HANDLES_OPEN = os.name != "nt"
+
+LineCallback = Callable[[str, float, int], None]
+"""Callback signature: ``callback(line, timestamp, event_id)``."""
+
+BatchCallback = Callable[[tuple[str, ...], float, int], None]
+"""Batch callback signature: ``callback(lines, timestamp, first_event_id)``."""
+
+
+if hasattr(os, "pread"):
+
+    def _read_at(reader: FileIO, size: int, offset: int) -> bytes:
+        """Read up to ``size`` bytes at ``offset`` in one syscall."""
+        return os.pread(reader.fileno(), size, offset)
+
+else:  # Windows
+
+    def _read_at(reader: FileIO, size: int, offset: int) -> bytes:
+        """Read up to ``size`` bytes at ``offset``."""
+        reader.seek(offset)
+        return reader.read(size)
+
+
+class LogEntry(NamedTuple):
+    """A buffered line with its capture metadata."""
+
+    line: str
+    timestamp: float
+    event_id: int
+
+
+class InterceptorStats(TypedDict):
+    """Monitoring statistics returned by :meth:`LogInterceptor.get_stats`."""
+
+    is_running: bool
+    is_paused: bool
+    lines_captured: int
+    events_processed: int
+    errors: int
+    target_errors: int
+    buffered_lines: int
+    start_time: float | None
+    stop_time: float | None
+    uptime_seconds: float
+
+
+def _combine_filters(filters: Sequence[BaseFilter]) -> BaseFilter:
+    """Combine AND-combined ``filters`` into a single filter.
+
+    Going through :class:`CompositeFilter` gives short-circuiting and its
+    regex fusion for free; a lone filter is used directly. The given order
+    is kept, since a filter may rely on the ones before it having matched.
+    """
+    if len(filters) == 1:
+        return filters[0]
+    return CompositeFilter(filters, reorder=False)
+
+
+class _UtcIsoFormatter:
+    """Format epoch timestamps as ISO 8601 UTC with microseconds.
+
+    The date/time part is rendered once per second and reused, so no
+    ``datetime`` object is built per line.
+    """
+
+    __slots__ = ("_prefix", "_second")
+
+    def __init__(self) -> None:
+        self._second = -1
+        self._prefix = ""
+
+    def __call__(self, timestamp: float) -> str:
+        second = int(timestamp)
+        # Round like ``datetime.fromtimestamp``, carrying into the next second.
+        micros = round((timestamp - second) * 1_000_000)
+        if micros == 1_000_000:
+            second += 1
+            micros = 0
+        if second != self._second:
+            self._prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._second = second
+        return f"{self._prefix}.{micros:06d}+00:00"
+
+
+class _LogFileEventHandler(FileSystemEventHandler):
+    """Forwards filesystem events for the source file to its interceptor.
+
+    ``source_path`` must lie in the resolved directory given to the
+    observer, so event paths can be compared as plain strings.
+    """
+
+    def __init__(self, interceptor: LogInterceptor, source_path: str) -> None:
+        super().__init__()
+        self._interceptor = interceptor
+        self._source_path = source_path
+        self._source_bytes = os.fsencode(source_path)
+
+    def _is_source(self, path: str | bytes) -> bool:
+        # watchdog reports str paths; bytes are matched without decoding.
+        return path == self._source_path or path == self._source_bytes
+
+    def on_modified(self, event: FileSystemEvent) -> None:
+        if not event.is_directory and self._is_source(event.src_path):
+            self._interceptor._notify()
+
+    def on_created(self, event: FileSystemEvent) -> None:
+        if not event.is_directory and self._is_source(event.src_path):
+            self._interceptor._notify(replaced=True)
+
+    def on_moved(self, event: FileSystemEvent) -> None:
+        if not event.is_directory and (
+            self._is_source(event.src_path) or self._is_source(event.dest_path)
+        ):
+            self._interceptor._notify(replaced=True)
+
+    def on_deleted(self, event: FileSystemEvent) -> None:
+        if not event.is_directory and self._is_source(event.src_path):
+            self._interceptor._notify(replaced=True)
+
+
+class LogInterceptor:
+    """Capture lines appended to an external log file without blocking.
+
+    A watchdog observer watches the directory of ``source_file``; events for
+    the file wake a worker thread that waits ``config.debounce_interval`` to
+    coalesce bursts, then reads every complete new line. With
+    ``config.poll_interval`` set, no observer is started and the worker
+    checks the file on that interval instead. Lines that pass all
+    ``filters`` are kept in an in-memory buffer, passed to callbacks and
+    optionally appended to ``target_file``. Only lines written after
+    :meth:`start` are captured. Lines read in the same pass share one
+    capture timestamp.
+
+    Args:
+        source_file: Log file to watch. It may not exist yet, but its
+            directory must.
+        target_file: Optional file to append captured lines to. Batches that
+            cannot be written are kept and retried with the next batch;
+            failed writes are counted in the ``target_errors`` statistic.
+        filters: Filters a line must all accept to be captured. They are
+            evaluated in the given order and stop at the first rejection,
+            so put cheap, selective filters first. Wrap them in a
+            :class:`CompositeFilter` to have them ordered by cost instead.
+        use_buffer: Keep captured lines in memory for
+            :meth:`get_buffered_lines` and :meth:`get_lines_with_metadata`.
+        add_timestamps: Prefix lines written to ``target_file`` with
+            ``[CAPTURED_AT: <ISO 8601 UTC>]``.
+        config: Tuning parameters; defaults to :class:`InterceptorConfig()`.
+
+    Example::
+
+        with LogInterceptor("app.log", filters=[RegexFilter("ERROR")]) as li:
+            run_application()
+            errors = li.get_buffered_lines()
+    """
+
+    def __init__(
+        self,
+        source_file: str | os.PathLike[str],
+        target_file: str | os.PathLike[str] | None = None,
+        *,
+        filters: Sequence[BaseFilter] | None = None,
+        use_buffer: bool = True,
+        add_timestamps: bool = False,
+        config: InterceptorConfig | None = None,
+    ) -> None:
+        self.source_file = Path(source_file)
+        self.target_file = Path(target_file) if target_file is not None else None
+        self.config = config if config is not None else InterceptorConfig()
+        self._filters: list[BaseFilter] = list(filters or ())
+        combined = _combine_filters(self._filters)
+        self._accept = combined.filter
+        self._accept_lines = combined.filter_lines
+        self._prefilter = build_prefilter(
+            self._filters, self.config.encoding, self.config.decode_errors
+        )
+        self._use_buffer = use_buffer
+        self._add_timestamps = add_timestamps
+        self._format_timestamp = _UtcIsoFormatter()
+        # Byte-order mark the encoding emits, e.g. for "utf-8-sig"; it may
+        # only start a new target file.
+        self._target_bom = "".encode(self.config.encoding)
+        # Decoded text may hold characters the encoding cannot represent,
+        # e.g. U+FFFD from "replace" with "ascii"; encoding them must not fail.
+        # Escaped surrogates are turned back into the original bytes.
+        self._encode_errors = (
+            "surrogateescape" if self.config.decode_errors == "surrogateescape" else "replace"
+        )
+
+        # Columns: line, timestamp, event id; the latter two are stored
+        # unboxed. Written only by the worker thread, so the capture path
+        # takes no lock.
+        # Without buffering nothing is pushed; a one-record ring keeps the
+        # read methods uniform without allocating ``buffer_size`` slots.
+        buffer_size = self.config.buffer_size if use_buffer else 1
+        self._buffer = SpscRing(buffer_size, (None, "d", "Q"))
+        # Replaced, never mutated, so the dispatch thread reads it without a
+        # lock; the lock only serializes add/remove.
+        self._callbacks: tuple[LineCallback, ...] = ()
+        self._batch_callbacks: tuple[BatchCallback, ...] = ()
+        self._callbacks_lock = threading.Lock()
+        # Batches of (lines, timestamp, first event id) for the callbacks, or
+        # None to stop the dispatch thread.
+        self._dispatch_queue: queue.SimpleQueue[tuple[list[str], float, int] | None] = (
+            queue.SimpleQueue()
+        )
+        self._dispatcher: threading.Thread | None = None
+
+        self._state_lock = threading.RLock()
+        self._observer: Any = None
+        self._worker: threading.Thread | None = None
+        self._wakeup = threading.Event()
+        self._stop_event = threading.Event()
+        # Plain flag: only ever polled, never waited on.
+        self._paused = False
+        self._running = False
+
+        # ``_file_position`` counts bytes read, including ``_pending``: the
+        # start of an incomplete last line, kept until its newline arrives.
+        self._file_position = 0
+        self._pending = b""
+        self._file_id: tuple[int, int] | None = None
+        # Set when the path may name a different file than the open reader
+        # (created, moved or deleted); until then the reader is fstat'ed.
+        self._path_changed = True
+        # Unbuffered handle to the source file, kept open between reads and
+        # reopened only after rotation or an I/O error.
+        self._reader: FileIO | None = None
+        # Descriptor of ``target_file`` kept open between batches, with the
+        # (device, inode) it was opened on to notice the path being rotated.
+        self._target_fd: int | None = None
+        self._target_id: tuple[int, int] | None = None
+        # Encoded batches (without a byte-order mark) not yet written to
+        # ``target_file``, with their line counts, oldest first.
+        self._target_backlog: collections.deque[tuple[bytes, int]] = collections.deque()
+        self._target_backlog_lines = 0
+
+        self._next_event_id = 1
+        self._lines_captured = 0
+        self._events_processed = 0
+        self._last_event = time.monotonic()
+        self._event_gap = 0.0
+        self._errors = 0
+        # Counted apart from ``_errors``: each is written by one thread only.
+        self._callback_errors = 0
+        self._target_errors = 0
+        self._start_time: float | None = None
+        self._stop_time: float | None = None
+        # Uptime is measured on the monotonic clock, immune to wall-clock jumps.
+        self._start_ns = 0
+        self._stop_ns: int | None = None
+
+    # -- lifecycle ---------------------------------------------------------
+
+    def start(self) -> None:
+        """Start watching the source file. Does nothing if already running.
+
+        Raises:
+            FileWatchError: If the source directory does not exist or cannot
+                be watched.
+        """
+        with self._state_lock:
+            if self._running:
+                return
+            watch_dir = self.source_file.parent
+            if not watch_dir.is_dir():
+                msg = f"Directory of source file does not exist: {watch_dir}"
+                raise FileWatchError(msg)
+            self._seek_to_end()
+            self._stop_event.clear()
+            self._wakeup.clear()
+            self._last_event = time.monotonic()
+
+            if self.config.poll_interval > 0:
+                run: Callable[[], None] = self._poll
+            else:
+                self._observer = self._start_observer(watch_dir)
+                run = self._run
+            self._dispatcher = threading.Thread(
+                target=self._dispatch,
+                name=f"LogInterceptor[{self.source_file.name}]-callbacks",
+                daemon=True,
+            )
+            self._dispatcher.start()
+            self._worker = threading.Thread(
+                target=run, name=f"LogInterceptor[{self.source_file.name}]", daemon=True
+            )
+            self._worker.start()
+            self._running = True
+            self._start_time = time.time()
+            self._start_ns = time.monotonic_ns()
+            self._stop_time = None
+            self._stop_ns = None
+            logger.debug("Started watching %s", self.source_file)
+
+    def stop(self) -> None:
+        """Stop watching, draining lines written before the call.
+
+        Does nothing if not running.
+        """
+        with self._state_lock:
+            if not self._running:
+                return
+            observer, self._observer = self._observer, None
+            if observer is not None:
+                observer.stop()
+                observer.join()
+            self._stop_event.set()
+            self._wakeup.set()
+            if self._worker is not None:
+                self._worker.join()
+                self._worker = None
+            if not self._paused:
+                self._process_safely()
+            # Callbacks still see every line captured before the call.
+            self._dispatch_queue.put(None)
+            if self._dispatcher is not None:
+                self._dispatcher.join()
+                self._dispatcher = None
+            if self._target_backlog and self.target_file is not None:
+                self._flush_target(self.target_file)
+            self._close_reader()
+            self._close_target()
+            self._running = False
+            self._stop_time = time.time()
+            self._stop_ns = time.monotonic_ns()
+            logger.debug("Stopped watching %s", self.source_file)
+
+    def pause(self) -> None:
+        """Suspend capturing; lines written meanwhile are read on :meth:`resume`."""
+        self._paused = True
+
+    def resume(self) -> None:
+        """Resume capturing and catch up on lines written while paused."""
+        self._paused = False
+        self._wakeup.set()
+
+    def is_running(self) -> bool:
+        """Return ``True`` between :meth:`start` and :meth:`stop`."""
+        return self._running
+
+    def is_paused(self) -> bool:
+        """Return ``True`` while capturing is paused."""
+        return self._paused
+
+    def __enter__(self) -> LogInterceptor:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.stop()
+
+    def __del__(self) -> None:
+        if getattr(self, "_running", False):
+            with contextlib.suppress(Exception):
+                self.stop()
+
+    # -- callbacks ---------------------------------------------------------
+
+    def add_callback(self, callback: LineCallback) -> None:
+        """Register ``callback(line, timestamp, event_id)`` for captured lines.
+
+        Callbacks run on a dedicated thread, one line at a time in capture
+        order, so a slow callback does not delay reading the file.
+        Exceptions they raise are logged and do not stop monitoring.
+        """
+        if not callable(callback):
+            msg = f"Callback must be callable, got {type(callback).__name__}"
+            raise TypeError(msg)
+        with self._callbacks_lock:
+            self._callbacks = (*self._callbacks, callback)
+
+    def remove_callback(self, callback: LineCallback) -> None:
+        """Unregister a callback. Unknown callbacks are ignored."""
+        with self._callbacks_lock:
+            callbacks = list(self._callbacks)
+            with contextlib.suppress(ValueError):
+                callbacks.remove(callback)
+            self._callbacks = tuple(callbacks)
+
+    def add_batch_callback(self, callback: BatchCallback) -> None:
+        """Register ``callback(lines, timestamp, first_event_id)``.
+
+        Called once per batch of lines captured in one pass, with the lines
+        as a tuple; their event ids run from ``first_event_id`` upwards. Runs
+        on the same thread as :meth:`add_callback` callbacks, after them,
+        and costs one call per batch instead of one per line.
+        """
+        if not callable(callback):
+            msg = f"Callback must be callable, got {type(callback).__name__}"
+            raise TypeError(msg)
+        with self._callbacks_lock:
+            self._batch_callbacks = (*self._batch_callbacks, callback)
+
+    def remove_batch_callback(self, callback: BatchCallback) -> None:
+        """Unregister a batch callback. Unknown callbacks are ignored."""
+        with self._callbacks_lock:
+            callbacks = list(self._batch_callbacks)
+            with contextlib.suppress(ValueError):
+                callbacks.remove(callback)
+            self._batch_callbacks = tuple(callbacks)
+
+    # -- buffer ------------------------------------------------------------
+
+    def get_buffered_lines(
+        self, last_n: int | None = None, *, filters: Sequence[BaseFilter] | None = None
+    ) -> list[str]:
+        """Return buffered lines, oldest first.
+
+        Args:
+            last_n: Return only the ``last_n`` most recent lines (of those
+                ``filters`` accept, if given).
+            filters: Filters a line must all accept to be returned. They are
+                applied to the buffered lines as one batch, see
+                :meth:`BaseFilter.filter_lines`.
+
+        Raises:
+            LogBufferError: If ``last_n`` is negative.
+            FilterError: If one of ``filters`` fails.
+        """
+        if last_n is not None and last_n < 0:
+            msg = f"last_n must be >= 0, got {last_n}"
+            raise LogBufferError(msg)
+        if not filters:
+            return self._buffer.snapshot(last_n, columns=(0,))[0]
+        lines = _combine_filters(filters).filter_lines(self._buffer.snapshot(columns=(0,))[0])
+        if last_n is not None:
+            return lines[max(len(lines) - last_n, 0) :]
+        return lines
+
+    def get_lines_with_metadata(self) -> list[LogEntry]:
+        """Return buffered lines as :class:`LogEntry` tuples, oldest first."""
+        return list(map(LogEntry, *self._buffer.snapshot()))
+
+    def clear_buffer(self) -> None:
+        """Drop all buffered lines.
+
+        Their memory is released at once when not running, otherwise by the
+        worker thread shortly after.
+        """
+        self._buffer.clear()
+        with self._state_lock:
+            if not self._running:
+                self._buffer.release()
+            else:
+                self._wakeup.set()
+
+    # -- statistics --------------------------------------------------------
+
+    def get_stats(self) -> InterceptorStats:
+        """Return a snapshot of monitoring statistics."""
+        start, stop = self._start_time, self._stop_time
+        uptime = 0.0
+        if start is not None:
+            end_ns = self._stop_ns
+            if end_ns is None:
+                end_ns = time.monotonic_ns()
+            uptime = (end_ns - self._start_ns) / 1e9
+        buffered = len(self._buffer)
+        return {
+            "is_running": self._running,
+            "is_paused": self._paused,
+            "lines_captured": self._lines_captured,
+            "events_processed": self._events_processed,
+            "errors": self._errors + self._callback_errors,
+            "target_errors": self._target_errors,
+            "buffered_lines": buffered,
+            "start_time": start,
+            "stop_time": stop,
+            "uptime_seconds": uptime,
+        }
+
+    # -- internals ---------------------------------------------------------
+
+    def _notify(self, *, replaced: bool = False) -> None:
+        """Called from the observer thread for each event on the source file.
+
+        ``replaced`` marks events that may have put a different file at the
+        source path.
+        """
+        if replaced:
+            self._path_changed = True
+        self._events_processed += 1
+        now = time.monotonic()
+        self._event_gap += _EVENT_GAP_WEIGHT * (now - self._last_event - self._event_gap)
+        self._last_event = now
+        # Events within a debounce window only re-set a set flag; the lock
+        # inside Event.set() is skipped for them. The worker clears the flag
+        # before reading, so the write behind this event is read either way.
+        if not self._wakeup.is_set():
+            self._wakeup.set()
+
+    def _start_observer(self, watch_dir: Path) -> Any:
+        # Resolve once here rather than per event in the handler.
+        watch_dir = watch_dir.resolve()
+        handler = _LogFileEventHandler(self, str(watch_dir / self.source_file.name))
+        observer = Observer()
+        observer.schedule(handler, str(watch_dir), recursive=False)
+        try:
+            observer.start()
+        except OSError as exc:
+            msg = f"Cannot watch {watch_dir}: {exc}"
+            raise FileWatchError(msg) from exc
+        return observer
+
+    def _poll(self) -> None:
+        """Check the file until stopped, backing off while it is idle.
+
+        A poll that finds new data is followed almost at once by the next,
+        since writes tend to come in bursts; each idle poll doubles the delay
+        up to ``config.poll_interval``.
+        """
+        longest = self.config.poll_interval
+        interval = min(longest, _MIN_POLL_INTERVAL)
+        while not self._stop_event.wait(interval):
+            self._buffer.release()  # lines dropped by clear_buffer()
+            if self._paused:
+                continue
+            position = self._file_position
+            # No events report a replaced file, so check the path itself.
+            self._path_changed = True
+            self._process_safely()
+            if self._file_position != position:
+                interval = min(longest, _MIN_POLL_INTERVAL)
+            else:
+                interval = min(longest, interval * 2)
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            self._wakeup.wait()
+            # Let a burst of writes settle so it is read in one pass.
+            if self._stop_event.wait(self._debounce_delay()):
+                return
+            self._wakeup.clear()
+            self._buffer.release()  # lines dropped by clear_buffer()
+            if not self._paused:
+                self._process_safely()
+
+    def _debounce_delay(self) -> float:
+        """Return how long to wait for more events before reading.
+
+        When events arrive further apart than ``debounce_interval`` on
+        average, waiting would only add latency, since nothing follows to be
+        coalesced.
+        """
+        interval = self.config.debounce_interval
+        if self.config.adaptive_debounce and self._event_gap > interval:
+            return min(interval, _MIN_DEBOUNCE)
+        return interval
+
+    def _seek_to_end(self) -> None:
+        self._pending = b""
+        self._path_changed = True
+        try:
+            st = self.source_file.stat()
+        except FileNotFoundError:
+            self._file_position = 0
+            self._file_id = None
+        else:
+            self._file_position = st.st_size
+            self._file_id = (st.st_dev, st.st_ino)
+
+    def _process_safely(self) -> None:
+        """Run :meth:`_process_new_lines`, retrying I/O errors with backoff.
+
+        Any other error is logged and counted, so it cannot end the worker.
+        """
+        try:
+            self._process_with_retries()
+        finally:
+            if not _KEEP_HANDLES_OPEN:
+                self._close_reader()
+                self._close_target()
+
+    def _process_with_retries(self) -> None:
+        attempts = self.config.retry_max_attempts if self.config.retry_on_error else 1
+        delay = self.config.retry_delay
+        for attempt in range(1, attempts + 1):
+            try:
+                self._process_new_lines()
+            except OSError as exc:
+                self._errors += 1
+                self._close_reader()
+                if attempt == attempts:
+                    logger.error(
+                        "Failed to read %s after %d attempt(s): %s",
+                        self.source_file,
+                        attempt,
+                        exc,
+                    )
+                    return
+                logger.warning("Error reading %s (attempt %d): %s", self.source_file, attempt, exc)
+                if self._stop_event.wait(delay):
+                    return
+                delay *= 2
+            except Exception:
+                self._errors += 1
+                logger.exception("Unexpected error processing %s", self.source_file)
+                return
+            else:
+                return
+
+    def _close_reader(self) -> None:
+        reader, self._reader = self._reader, None
+        if reader is not None:
+            with contextlib.suppress(OSError):
+                reader.close()
+
+    def _process_new_lines(self) -> None:
+        reader = self._reader
+        if reader is not None and not self._path_changed:
+            # Only writes happened since the last pass: the open file is
+            # still the one at the path, and fstat skips the path lookup.
+            st = os.fstat(reader.fileno())
+        else:
+            self._path_changed = False
+            try:
+                st = self.source_file.stat()
+            except FileNotFoundError:
+                self._close_reader()
+                return
+        file_id = (st.st_dev, st.st_ino)
+        rotated = self._file_id is not None and file_id != self._file_id
+        if rotated or st.st_size < self._file_position:
+            logger.info("Detected rotation or truncation of %s", self.source_file)
+            self._file_position = 0 if self.config.follow_rotations else st.st_size
+            self._pending = b""
+            if rotated:
+                self._close_reader()
+        self._file_id = file_id
+        if st.st_size == self._file_position:
+            return
+
+        reader = self._reader
+        if reader is None:
+            reader = self._reader = self.source_file.open("rb", buffering=0)
+            if hasattr(os, "posix_fadvise"):
+                # Let the kernel read ahead aggressively for the tail reads;
+                # only a hint, so file systems that reject it are fine.
+                with contextlib.suppress(OSError):
+                    os.posix_fadvise(reader.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        remaining = st.st_size - self._file_position
+        # Read in bounded blocks so a large backlog (e.g. after a rotation)
+        # is streamed through the filters instead of loaded all at once. One
+        # pread per block: a debounced batch under _READ_CHUNK_SIZE is a
+        # single read, a larger one costs one syscall per 64 KiB.
+        while remaining > 0:
+            chunk = _read_at(reader, min(_READ_CHUNK_SIZE, remaining), self._file_position)
+            if not chunk:
+                break
+            self._file_position += len(chunk)
+            remaining -= len(chunk)
+            pending = self._pending
+            data = pending + chunk if pending else chunk
+            end = data.rfind(b"\n") + 1
+            self._pending = data[end:]  # incomplete line; wait for its newline
+            if end:
+                self._process_chunk(data, end)
+
+    def _process_chunk(self, data: bytes, end: int) -> None:
+        """Decode and handle the complete lines in ``data[:end]``."""
+        if self._prefilter is not None:
+            self._handle_lines(self._candidate_lines(data, end))
+            return
+        # Decode all complete lines at once through a zero-copy view and split
+        # the text, so no intermediate ``bytes`` object is built per line.
+        text = str(memoryview(data)[:end], self.config.encoding, self.config.decode_errors)
+        new_lines = text.split("\n")
+        new_lines.pop()  # empty piece after the final newline
+        if "\r" in text:
+            new_lines = [line.rstrip("\r") for line in new_lines]
+        self._handle_lines(new_lines)
+
+    def _candidate_lines(self, data: bytes, end: int) -> list[str]:
+        """Decode only the lines in ``data[:end]`` the prefilter matches.
+
+        Lines without a required literal cannot pass the filters, so they are
+        skipped as raw bytes and never decoded.
+        """
+        search = self._prefilter.search  # type: ignore[union-attr]
+        view = memoryview(data)
+        encoding, errors = self.config.encoding, self.config.decode_errors
+        lines: list[str] = []
+        pos = 0
+        while (match := search(data, pos, end)) is not None:
+            newline = data.rfind(b"\n", pos, match.start())
+            start = pos if newline < 0 else newline + 1
+            stop = data.find(b"\n", match.start(), end)
+            lines.append(str(view[start:stop], encoding, errors).rstrip("\r"))
+            pos = stop + 1
+        return lines
+
+    def _handle_lines(self, lines: list[str]) -> None:
+        if not self._filters:
+            filtered = lines  # nothing to evaluate, and no copy
+        else:
+            try:
+                filtered = self._accept_lines(lines)
+            except Exception:
+                # Redo the batch line by line so only the failing lines are lost.
+                filtered = self._filter_each(lines)
+        if not filtered:
+            return
+        # Lines read in one pass were captured together; one clock read
+        # serves them all.
+        timestamp = time.time()
+        first_id = self._next_event_id
+        self._next_event_id = first_id + len(filtered)
+        if self._use_buffer:
+            push = self._buffer.push
+            for event_id, line in enumerate(filtered, first_id):
+                push(line, timestamp, event_id)
+        if self._callbacks or self._batch_callbacks:
+            self._dispatch_queue.put((filtered, timestamp, first_id))
+        self._lines_captured += len(filtered)
+        if self.target_file is not None:
+            self._write_target(self.target_file, filtered, timestamp)
+
+    def _dispatch(self) -> None:
+        """Run callbacks for queued batches until the ``None`` sentinel."""
+        get = self._dispatch_queue.get
+        while (batch := get()) is not None:
+            lines, timestamp, first_id = batch
+            callbacks = self._callbacks
+            for event_id, line in enumerate(lines, first_id):
+                for callback in callbacks:
+                    try:
+                        callback(line, timestamp, event_id)
+                    except Exception:
+                        self._callback_errors += 1
+                        logger.exception("Callback %r failed for event %d", callback, event_id)
+            batch_callbacks = self._batch_callbacks
+            if batch_callbacks:
+                captured = tuple(lines)
+                for batch_callback in batch_callbacks:
+                    try:
+                        batch_callback(captured, timestamp, first_id)
+                    except Exception:
+                        self._callback_errors += 1
+                        logger.exception(
+                            "Batch callback %r failed for events from %d", batch_callback, first_id
+                        )
+
+    def _filter_each(self, lines: list[str]) -> list[str]:
+        accept = self._accept
+        filtered: list[str] = []
+        keep = filtered.append
+        for line in lines:
+            try:
+                if accept(line):
+                    keep(line)
+            except Exception:
+                # Any error from a user filter rejects just this line.
+                self._errors += 1
+                logger.exception("Filter failed; dropping line %r", line)
+        return filtered
+
+    def _write_target(self, target: Path, lines: list[str], timestamp: float) -> None:
+        # The batch shares one timestamp, so it is rendered as a single join,
+        # encoded once and appended with a single write.
+        prefix = ""
+        if self._add_timestamps:
+            prefix = f"[CAPTURED_AT: {self._format_timestamp(timestamp)}] "
+        text = prefix + f"\n{prefix}".join(lines) + "\n"
+        data = text.encode(self.config.encoding, self._encode_errors)
+        self._target_backlog.append((data[len(self._target_bom) :], len(lines)))
+        self._target_backlog_lines += len(lines)
+        self._flush_target(target)
+
+    def _flush_target(self, target: Path) -> None:
+        """Append the backlog to ``target``, retrying I/O errors with backoff.
+
+        Failures concern only the target: the source position has already
+        moved on, so batches that cannot be written stay in the backlog for
+        the next batch or :meth:`stop`. Beyond ``config.buffer_size`` lines
+        the oldest batches are dropped.
+        """
+        attempts = self.config.retry_max_attempts if self.config.retry_on_error else 1
+        delay = self.config.retry_delay
+        for attempt in range(1, attempts + 1):
+            try:
+                self._write_backlog(target)
+            except OSError as exc:
+                self._target_errors += 1
+                self._close_target()
+                if attempt == attempts or self._stop_event.wait(delay):
+                    logger.error(
+                        "Failed to write %d line(s) to %s after %d attempt(s): %s",
+                        self._target_backlog_lines,
+                        target,
+                        attempt,
+                        exc,
+                    )
+                    self._trim_target_backlog(target)
+                    return
+                logger.warning("Error writing %s (attempt %d): %s", target, attempt, exc)
+                delay *= 2
+            else:
+                return
+
+    def _write_backlog(self, target: Path) -> None:
+        backlog = self._target_backlog
+        while backlog:
+            data, count = backlog[0]
+            fd = self._open_target(target)
+            if self._target_bom and not os.fstat(fd).st_size:
+                os.write(fd, self._target_bom)
+            view = memoryview(data)
+            try:
+                while view:
+                    view = view[os.write(fd, view) :]
+            finally:
+                if view:  # keep only what was not written
+                    backlog[0] = (bytes(view), count)
+            backlog.popleft()
+            self._target_backlog_lines -= count
+
+    def _trim_target_backlog(self, target: Path) -> None:
+        backlog = self._target_backlog
+        dropped = 0
+        while len(backlog) > 1 and self._target_backlog_lines > self.config.buffer_size:
+            _, count = backlog.popleft()
+            self._target_backlog_lines -= count
+            dropped += count
+        if dropped:
+            logger.error("Dropped %d line(s) that could not be written to %s", dropped, target)
+
+    def _open_target(self, target: Path) -> int:
+        """Return a descriptor appending to ``target``.
+
+        The descriptor is reused across batches; one ``stat`` of the path
+        per batch replaces an open/close pair. A target that was rotated or
+        deleted is reopened, so writes follow the path.
+        """
+        if self._target_fd is not None:
+            try:
+                st = os.stat(target)
+            except FileNotFoundError:
+                pass
+            else:
+                if (st.st_dev, st.st_ino) == self._target_id:
+                    return self._target_fd
+            self._close_target()
+        fd = os.open(target, _TARGET_FLAGS, 0o666)
+        st = os.fstat(fd)
+        self._target_fd, self._target_id = fd, (st.st_dev, st.st_ino)
+        return fd
+
+    def _close_target(self) -> None:
+        fd, self._target_fd = self._target_fd, None
+        self._target_id = None
+        if fd is not None:
+            with contextlib.suppress(OSError):
+                os.close(fd)
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import contextlib
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+import pytest
+
+
+class MockLogWriter:
+    """Simulates an external application appending lines to a log file.
+
+    Without :meth:`start`, each :meth:`write_line` appends synchronously.
+    After :meth:`start`, lines are queued and written by a background thread,
+    ``write_delay`` seconds apart.
+    """
+
+    def __init__(self, log_file: Path, write_delay: float = 0.0) -> None:
+        self.log_file = Path(log_file)
+        self.write_delay = write_delay
+        self._queue: queue.Queue[str | None] = queue.Queue()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._worker, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Write all queued lines, then stop the background thread."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def write_line(self, line: str) -> None:
+        if self._thread is not None:
+            self._queue.put(line)
+        else:
+            self._write_to_file(line)
+
+    def write_burst(self, lines: Iterable[str], interval: float = 0.001) -> None:
+        if not interval and self._thread is None:
+            self._write_to_file(*lines)  # one append for the whole burst
+            return
+        for line in lines:
+            self.write_line(line)
+            if interval:
+                time.sleep(interval)
+
+    def rotate_file(self, suffix: str = ".1") -> Path:
+        """Rename the log file away and create an empty one in its place."""
+        rotated = self.log_file.with_name(self.log_file.name + suffix)
+        self.log_file.rename(rotated)
+        self.log_file.touch()
+        return rotated
+
+    def _worker(self) -> None:
+        while True:
+            line = self._queue.get()
+            if line is None:
+                return
+            if self.write_delay:
+                self._write_to_file(line)
+                time.sleep(self.write_delay)
+                continue
+            # Without a delay, append everything queued so far in one write.
+            batch = [line]
+            with contextlib.suppress(queue.Empty):
+                while (line := self._queue.get_nowait()) is not None:
+                    batch.append(line)
+            self._write_to_file(*batch)
+            if line is None:
+                return
+
+    def _write_to_file(self, *lines: str) -> None:
+        # Reopened per write, so writes follow the path across rotate_file().
+        with self.log_file.open("a", encoding="utf-8") as f:
+            f.write("".join(line + "\n" for line in lines))
+
+
+@pytest.fixture
+def source_file(tmp_path: Path) -> Path:
+    path = tmp_path / "app.log"
+    path.touch()
+    return path
+
+
+@pytest.fixture
+def target_file(tmp_path: Path) -> Path:
+    return tmp_path / "captured.log"
+
+
+@pytest.fixture
+def writer(source_file: Path) -> MockLogWriter:
+    return MockLogWriter(source_file)
+
+
+@pytest.fixture
+def wait_for() -> Callable[..., bool]:
+    """Poll ``condition`` until it is true or ``timeout`` seconds pass."""
+
+    def _wait_for(condition: Callable[[], bool], timeout: float = 5.0) -> bool:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if condition():
+                return True
+            time.sleep(0.01)
+        return condition()
+
+    return _wait_for
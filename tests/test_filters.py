@@ -0,0 +1,628 @@
+from __future__ import annotations
+
+import re
+
+import pytest
+
+from log_interceptor import (
+    BaseFilter,
+    BatchPredicateFilter,
+    CompositeFilter,
+    FilterError,
+    HyperscanFilter,
+    PredicateFilter,
+    RegexFilter,
+)
+from log_interceptor import filters as filters_module
+from log_interceptor.filters import build_prefilter
+
+
+def _spy(result: bool, calls: list[str]) -> PredicateFilter:
+    def predicate(line: str) -> bool:
+        calls.append(line)
+        return result
+
+    return PredicateFilter(predicate)
+
+
+def test_regex_filter_whitelist():
+    f = RegexFilter(r"^ERROR")
+    assert f.filter("ERROR: disk full")
+    assert not f.filter("INFO: ERROR later in line")
+
+
+def test_regex_filter_blacklist():
+    f = RegexFilter(r"DEBUG", mode="blacklist")
+    assert f.filter("INFO: started")
+    assert not f.filter("DEBUG: noisy")
+
+
+def test_regex_filter_case_insensitive():
+    f = RegexFilter(r"error", case_sensitive=False)
+    assert f.filter("ERROR: boom")
+    assert not RegexFilter(r"error").filter("ERROR: boom")
+
+
+def test_regex_filter_shares_compiled_patterns():
+    assert RegexFilter(r"ERR\w+").pattern is RegexFilter(r"ERR\w+").pattern
+    insensitive = RegexFilter(r"ERR\w+", case_sensitive=False)
+    assert insensitive.pattern is not RegexFilter(r"ERR\w+").pattern
+
+
+def test_regex_filter_pattern_cache_is_bounded():
+    for i in range(600):
+        RegexFilter(f"generated-{i}")
+    assert filters_module._compile.cache_info().currsize <= 512
+
+
+def test_regex_filter_parses_required_literal_once():
+    RegexFilter(r"ERROR \d+ in cache test")
+    hits = filters_module._required_literal.cache_info().hits
+    assert RegexFilter(r"ERROR \d+ in cache test")._required == " in cache test"
+    assert filters_module._required_literal.cache_info().hits == hits + 1
+
+
+def test_regex_filter_invalid_pattern():
+    with pytest.raises(FilterError):
+        RegexFilter(r"(unclosed")
+
+
+def test_regex_filter_invalid_mode():
+    with pytest.raises(FilterError):
+        RegexFilter(r"x", mode="greylist")  # type: ignore[arg-type]
+
+
+def test_predicate_filter():
+    f = PredicateFilter(lambda line: len(line) > 5)
+    assert f.filter("long enough")
+    assert not f.filter("short")
+
+
+def test_predicate_filter_cache():
+    calls: list[str] = []
+    f = PredicateFilter(_spy(True, calls).predicate, cache_size=2)
+    for line in ["heartbeat", "heartbeat", "other", "heartbeat", "third", "other"]:
+        assert f.filter(line)
+    assert calls == ["heartbeat", "other", "third", "other"]
+    uncached = PredicateFilter(_spy(True, calls).predicate)
+    uncached.filter("heartbeat")
+    uncached.filter("heartbeat")
+    assert calls[-2:] == ["heartbeat", "heartbeat"]
+    with pytest.raises(FilterError, match="cache_size"):
+        PredicateFilter(bool, cache_size=-1)
+
+
+def test_predicate_filter_wraps_errors():
+    f = PredicateFilter(lambda line: 1 / 0)  # type: ignore[arg-type, return-value]
+    with pytest.raises(FilterError) as exc_info:
+        f.filter("line")
+    assert isinstance(exc_info.value.__cause__, ZeroDivisionError)
+
+
+def test_predicate_filter_requires_callable():
+    with pytest.raises(FilterError):
+        PredicateFilter("not callable")  # type: ignore[arg-type]
+
+
+def test_batch_predicate_filter():
+    calls = []
+
+    def long_lines(lines):
+        calls.append(len(lines))
+        return [len(line) > 3 for line in lines]
+
+    f = BatchPredicateFilter(long_lines)
+    assert f.filter_lines(["a", "long one", "bb", "also long"]) == ["long one", "also long"]
+    assert f.filter("long")
+    assert not f.filter("no")
+    assert f.filter_lines([]) == []
+    assert calls == [4, 1, 1]
+    combined = CompositeFilter([f, RegexFilter("one")])
+    assert combined.filter_lines(["a", "long one", "one"]) == ["long one"]
+
+
+def test_batch_predicate_filter_errors():
+    with pytest.raises(FilterError, match="callable"):
+        BatchPredicateFilter("nope")  # type: ignore[arg-type]
+    with pytest.raises(FilterError, match="returned 1 values for 2 lines"):
+        BatchPredicateFilter(lambda lines: [True]).filter_lines(["a", "b"])
+    with pytest.raises(FilterError, match="failed"):
+        BatchPredicateFilter(lambda lines: 1 / 0).filter("a")
+
+
+def test_composite_filter_and():
+    f = CompositeFilter([RegexFilter(r"ERROR"), PredicateFilter(lambda line: "disk" in line)])
+    assert f.filter("ERROR: disk full")
+    assert not f.filter("ERROR: network down")
+    assert not f.filter("INFO: disk ok")
+
+
+def test_composite_filter_or():
+    f = CompositeFilter([RegexFilter(r"ERROR"), RegexFilter(r"CRITICAL")], mode="OR")
+    assert f.filter("ERROR: x")
+    assert f.filter("CRITICAL: y")
+    assert not f.filter("INFO: z")
+
+
+def test_composite_filter_nested():
+    f = CompositeFilter(
+        [
+            PredicateFilter(lambda line: len(line) > 10),
+            CompositeFilter([RegexFilter(r"ERROR"), RegexFilter(r"WARNING")], mode="OR"),
+        ]
+    )
+    assert f.filter("WARNING: low memory")
+    assert not f.filter("ERROR: x")
+    assert not f.filter("INFO: nothing to see")
+
+
+def test_composite_filter_empty():
+    assert CompositeFilter([], mode="AND").filter("anything")
+    assert not CompositeFilter([], mode="OR").filter("anything")
+
+
+def test_composite_filter_folds_constant_predicates():
+    error = RegexFilter("ERROR")
+    true, false = PredicateFilter.TRUE, PredicateFilter.FALSE
+    assert CompositeFilter([true, error], mode="AND").filters == [error]
+    assert CompositeFilter([error, false], mode="OR").filters == [error]
+    assert CompositeFilter([error, false, true], mode="AND").filters == [false]
+    assert CompositeFilter([true, error], mode="OR", reorder=False).filters == [true]
+    assert true.filter("x") and not false.filter("x")
+
+
+def test_composite_filter_and_short_circuits():
+    calls: list[str] = []
+    f = CompositeFilter([_spy(False, []), _spy(True, calls)], mode="AND")
+    assert not f.filter("line")
+    assert calls == []
+
+
+def test_composite_filter_or_short_circuits():
+    calls: list[str] = []
+    f = CompositeFilter([_spy(True, []), _spy(False, calls)], mode="OR")
+    assert f.filter("line")
+    assert calls == []
+
+
+def test_composite_filter_bound_path_matches_generic():
+    lines = ["ERROR: disk full", "ERROR", "INFO: disk", ""]
+    children = [RegexFilter("ERROR"), PredicateFilter(lambda x: len(x) > 5)]
+    for mode, combine in (("AND", all), ("OR", any)):
+        f = CompositeFilter(children, mode=mode)
+        expected = [combine(c.filter(x) for c in children) for x in lines]
+        assert [f.filter(x) for x in lines] == expected
+
+
+def test_composite_filter_orders_by_cost():
+    regex, literal = RegexFilter(r"ERR\w+"), RegexFilter("ERROR")
+    length = PredicateFilter(lambda line: len(line) > 30)
+    f = CompositeFilter([regex, literal, length])
+    assert f.filters == [length, literal, regex]
+    assert CompositeFilter([regex, literal, length], reorder=False).filters == [
+        regex,
+        literal,
+        length,
+    ]
+
+
+def test_composite_filter_adapts_order_to_pass_rates():
+    permissive = PredicateFilter(lambda line: True)
+    selective = PredicateFilter(lambda line: line == "keep")
+    f = CompositeFilter([permissive, selective])
+    assert f.filters == [permissive, selective]
+    results = [f.filter("keep" if i % 100 == 0 else "drop") for i in range(64 * 16)]
+    assert f.filters == [selective, permissive]
+    assert results == [i % 100 == 0 for i in range(64 * 16)]
+    assert f.filter("keep")
+    assert not f.filter("drop")
+
+
+def test_composite_filter_or_adapts_order_to_pass_rates():
+    rare = PredicateFilter(lambda line: line == "rare")
+    common = PredicateFilter(lambda line: line != "rare")
+    f = CompositeFilter([rare, common], mode="OR")
+    for _ in range(64 * 16):
+        assert f.filter("common")
+    assert f.filters == [common, rare]
+
+
+def test_composite_filter_keeps_order_without_reorder():
+    permissive = PredicateFilter(lambda line: True)
+    selective = PredicateFilter(lambda line: False)
+    f = CompositeFilter([permissive, selective], reorder=False)
+    for _ in range(64 * 16):
+        f.filter("line")
+    assert f.filters == [permissive, selective]
+
+
+def test_composite_filter_sampling_ignores_errors_after_decision():
+    def fragile(line: str) -> bool:
+        raise ValueError(line)
+
+    f = CompositeFilter([PredicateFilter(lambda line: line != "drop"), PredicateFilter(fragile)])
+    for _ in range(64 * 16):
+        assert not f.filter("drop")
+    assert f.filters[1].predicate is fragile
+
+
+def test_composite_filter_drops_duplicate_regexes():
+    f = CompositeFilter([RegexFilter("ERROR"), RegexFilter("ERROR"), RegexFilter("WARN")])
+    assert [x.pattern.pattern for x in f.filters] == ["ERROR", "WARN"]
+    assert f.filter("ERROR WARN")
+    assert not f.filter("ERROR")
+
+
+def test_composite_filter_invalid_mode():
+    with pytest.raises(FilterError):
+        CompositeFilter([], mode="XOR")  # type: ignore[arg-type]
+
+
+def test_regex_filter_union():
+    f = RegexFilter.union(r"ERROR", r"WARNING", r"CRITICAL")
+    assert f.filter("WARNING: low memory")
+    assert f.filter("CRITICAL: failure")
+    assert not f.filter("INFO: ok")
+
+
+def test_regex_filter_union_requires_patterns():
+    with pytest.raises(FilterError):
+        RegexFilter.union()
+
+
+def test_composite_filter_fuses_or_whitelist():
+    f = CompositeFilter([RegexFilter(r"ERROR"), RegexFilter(r"WARN\w*")], mode="OR")
+    assert f._fused is not None
+    assert f.filter("WARNING: x")
+    assert not f.filter("INFO: y")
+
+
+def test_composite_filter_fuses_and_blacklist():
+    f = CompositeFilter(
+        [RegexFilter(r"DEBUG", mode="blacklist"), RegexFilter(r"TRACE", mode="blacklist")]
+    )
+    assert f._fused is not None
+    assert f.filter("INFO: kept")
+    assert not f.filter("TRACE: dropped")
+    assert not f.filter("DEBUG: dropped")
+
+
+def test_composite_filter_not_fused_when_unsafe():
+    backref = CompositeFilter([RegexFilter(r"(a)\1"), RegexFilter(r"b")], mode="OR")
+    assert backref._fused is None
+    assert backref.filter("xaay")
+    mixed_flags = CompositeFilter(
+        [RegexFilter(r"error", case_sensitive=False), RegexFilter(r"WARN")], mode="OR"
+    )
+    assert mixed_flags._fused is None
+    assert mixed_flags.filter("ERROR")
+    assert not mixed_flags.filter("warn")
+
+
+@pytest.mark.parametrize(
+    ("pattern", "needles"),
+    [
+        ("ERROR", ("ERROR",)),
+        ("disk full: sda1", ("disk full: sda1",)),
+        ("ERROR|WARNING", ("ERROR", "WARNING")),
+        ("(?:ERROR)|(?:CRITICAL)", ("ERROR", "CRITICAL")),
+        (re.escape("disk full (sda1) 100%"), ("disk full (sda1) 100%",)),
+        (r"C:\\temp|a\.b", ("C:\\temp", "a.b")),
+        (r"^ERROR", None),
+        (r"ERROR\d", None),
+        (r"ERR.R", None),
+        (r"a\|b", None),
+        ("(ERROR|WARNING)", None),
+    ],
+)
+def test_regex_filter_literal_detection(pattern, needles):
+    assert RegexFilter(pattern)._needles == needles
+
+
+def test_regex_filter_literal_fast_path_matches_regex():
+    lines = ["ERROR: a", "WARNING: b", "INFO: c", "error: d", ""]
+    for pattern in ("ERROR", "ERROR|WARNING"):
+        for mode in ("whitelist", "blacklist"):
+            f = RegexFilter(pattern, mode=mode)
+            expected = [(f.pattern.search(x) is not None) == (mode == "whitelist") for x in lines]
+            assert [f.filter(x) for x in lines] == expected
+
+
+@pytest.mark.parametrize(
+    ("pattern", "prefixes", "suffixes"),
+    [
+        ("^ERROR", ("ERROR",), None),
+        ("^ERROR|^WARN", ("ERROR", "WARN"), None),
+        ("done$", None, ("done", "done\n")),
+        ("^ERROR|done$", None, None),
+        ("^ERROR$", None, None),
+        (r"^ERR\w", None, None),
+    ],
+)
+def test_regex_filter_anchored_literal_detection(pattern, prefixes, suffixes):
+    f = RegexFilter(pattern)
+    assert (f._prefixes, f._suffixes) == (prefixes, suffixes)
+
+
+def test_regex_filter_anchored_fast_path_matches_regex():
+    lines = ["ERROR: a", "x ERROR", "WARN b", "all done", "done\n", "done now", ""]
+    for pattern in ("^ERROR", "^ERROR|^WARN", "done$"):
+        for mode in ("whitelist", "blacklist"):
+            f = RegexFilter(pattern, mode=mode)
+            expected = [(f.pattern.search(x) is not None) == (mode == "whitelist") for x in lines]
+            assert [f.filter(x) for x in lines] == expected
+            assert f.filter_lines(lines) == [x for x, keep in zip(lines, expected) if keep]
+    assert RegexFilter("done$").required_literals() == ("done",)
+
+
+@pytest.mark.parametrize(
+    ("pattern", "required"),
+    [
+        (r"ERROR \d+", "ERROR "),
+        (r"^\[(\w+)\] disk full: (sd\w+)", "] disk full: sd"),
+        (r"(?:foo)(bar)\d+x", "foobar"),
+        (r"id=\d+ (?i:error)", "id="),
+        (r"(?i)error \d+", None),
+        (r"(ERROR|WARN) \d+", None),
+        (r"x*y+", None),
+    ],
+)
+def test_regex_filter_required_literal(pattern, required):
+    assert RegexFilter(pattern)._required == required
+
+
+def test_regex_filter_required_literal_guard_matches_regex():
+    lines = ["ERROR 42", "ERROR x", "INFO 42", "id=7 Error", "id=7 ok", ""]
+    for pattern in (r"ERROR \d+", r"id=\d+ (?i:error)"):
+        for mode in ("whitelist", "blacklist"):
+            f = RegexFilter(pattern, mode=mode)
+            expected = [(f.pattern.search(x) is not None) == (mode == "whitelist") for x in lines]
+            assert [f.filter(x) for x in lines] == expected
+
+
+def test_filter_lines_matches_filter():
+    lines = ["ERROR 1", "WARN x", "INFO: ok", "error 2", "", "ERROR x", "id=3 Error"]
+    filters = [
+        RegexFilter(r"ERROR \d"),
+        RegexFilter(r"ERROR \d", mode="blacklist"),
+        RegexFilter(r"\d"),
+        RegexFilter(r"\d", mode="blacklist"),
+        RegexFilter("ERROR"),
+        RegexFilter("ERROR", mode="blacklist"),
+        RegexFilter("ERROR|WARN"),
+        RegexFilter("error", case_sensitive=False),
+        HyperscanFilter("WARN", r"\d"),
+        PredicateFilter(bool),
+        CompositeFilter([RegexFilter(r"\d"), PredicateFilter(lambda line: "E" in line)]),
+        CompositeFilter([RegexFilter("WARN"), RegexFilter(r"\d")], mode="OR"),
+        CompositeFilter([RegexFilter("A"), RegexFilter("B")], mode="OR"),
+        CompositeFilter([]),
+    ]
+    for f in filters:
+        assert f.filter_lines(lines) == [line for line in lines if f.filter(line)], f
+
+
+def test_composite_filter_lines_keeps_sampling():
+    calls: list[str] = []
+    f = CompositeFilter([_spy(False, calls), RegexFilter("ERROR")])
+    lines = [f"line {i}" for i in range(200)]
+    assert f.filter_lines(lines) == []
+    # Every 64th line is sampled against both children, as with filter().
+    assert f._samples == 3
+    assert f._lines == 200
+    assert len(calls) == 200 + 3
+
+
+def test_composite_filter_sampling_ignores_undecisive_errors():
+    class Picky(BaseFilter):
+        def filter(self, line: str) -> bool:
+            raise ValueError(line)
+
+    f = CompositeFilter([RegexFilter("ERROR"), Picky()], mode="OR")
+    assert all(f.filter("ERROR bad") for _ in range(200))
+    assert f._samples == 3  # every 64th line evaluated both children
+
+
+def test_builtin_filters_use_slots():
+    filters = [
+        RegexFilter("ERROR"),
+        HyperscanFilter("ERROR", "WARN"),
+        PredicateFilter(bool),
+        BatchPredicateFilter(list),
+        CompositeFilter([RegexFilter("A"), PredicateFilter(bool)]),
+    ]
+    for f in filters:
+        assert not hasattr(f, "__dict__")
+
+
+def test_regex_filter_mode_resolved_at_construction():
+    assert RegexFilter(r"E\w+")._match.__func__ is RegexFilter._search_white
+    assert RegexFilter(r"E\w+", mode="blacklist")._match.__func__ is RegexFilter._search_black
+    assert RegexFilter(r"ERR\w+")._match.__func__ is RegexFilter._guarded_white
+    assert RegexFilter("ERROR")._match.__func__ is RegexFilter._contains_white
+    assert RegexFilter("A|B", mode="blacklist")._match.__func__ is RegexFilter._any_black
+
+
+def test_overridden_filter_is_honoured():
+    class ShortErrors(RegexFilter):
+        def filter(self, line):
+            return super().filter(line) and len(line) < 10
+
+    f = ShortErrors("ERROR")
+    lines = ["ERROR 1", "ERROR: far too long", "INFO"]
+    assert [f.filter(x) for x in lines] == [True, False, False]
+    assert f.filter_lines(lines) == ["ERROR 1"]
+    for mode in ("AND", "OR"):
+        composite = CompositeFilter([f, RegexFilter("1|long")], mode=mode)
+        expected = ["ERROR 1"] if mode == "AND" else ["ERROR 1", "ERROR: far too long"]
+        assert [x for x in lines if composite.filter(x)] == expected
+        assert composite.filter_lines(lines) == expected
+
+
+def test_regex_filter_literal_case_insensitive():
+    f = RegexFilter("error|Warn", case_sensitive=False)
+    assert f._needles is None  # no exact-case literals for the prefilter
+    assert f._folded == ("error", "warn")
+    lines = ["ERROR: boom", "warning", "INFO: ok", "café ErRoR", "ſ", "İnfo"]
+    for mode in ("whitelist", "blacklist"):
+        f = RegexFilter("error|Warn|s|ix", mode=mode, case_sensitive=False)
+        expected = [(f.pattern.search(x) is not None) == (mode == "whitelist") for x in lines]
+        assert [f.filter(x) for x in lines] == expected
+
+
+@pytest.mark.parametrize("use_hyperscan", [True, False])
+def test_hyperscan_filter(use_hyperscan, monkeypatch):
+    if use_hyperscan:
+        pytest.importorskip("hyperscan")
+    else:
+        monkeypatch.setattr(filters_module, "hyperscan", None)
+    f = HyperscanFilter(r"ERR\w+", "CRITICAL", "café")
+    assert f.uses_hyperscan is use_hyperscan
+    assert f.filter("ERROR: disk full")
+    assert f.filter("CRITICAL: boom")
+    assert f.filter("café ouvert")
+    assert not f.filter("INFO: ERR")
+    blacklist = HyperscanFilter("DEBUG", r"TRACE\d", mode="blacklist")
+    assert blacklist.filter("INFO: ok")
+    assert not blacklist.filter("TRACE1: noisy")
+    caseless = HyperscanFilter("error", case_sensitive=False)
+    assert caseless.filter("ERROR: boom")
+
+
+def test_regex_filter_re2_engine():
+    pytest.importorskip("re2")
+    f = RegexFilter(r"(ERROR|WARN) \d+", engine="re2")
+    assert f.engine == "re2"
+    assert f.filter("ERROR 42")
+    assert not f.filter("ERROR x")
+    caseless = RegexFilter(r"err\w+", mode="blacklist", case_sensitive=False, engine="re2")
+    assert not caseless.filter("ERROR: boom")
+    assert caseless.filter("INFO: ok")
+    with pytest.raises(FilterError, match="re2"):
+        RegexFilter(r"(a)\1", engine="re2")
+
+
+def test_regex_filter_re2_engine_requires_package(monkeypatch):
+    monkeypatch.setattr(filters_module, "re2", None)
+    filters_module._compile_re2.cache_clear()
+    with pytest.raises(FilterError, match="google-re2"):
+        RegexFilter(r"ERR\w+", engine="re2")
+
+
+def test_regex_filter_invalid_engine():
+    with pytest.raises(FilterError, match="engine"):
+        RegexFilter("ERROR", engine="pcre")  # type: ignore[arg-type]
+
+
+def test_hyperscan_filter_falls_back_for_unsupported_patterns():
+    f = HyperscanFilter(r"(a)\1")
+    assert not f.uses_hyperscan
+    assert f.filter("xaa")
+    assert not f.filter("xab")
+
+
+@pytest.mark.parametrize("use_hyperscan", [True, False])
+def test_hyperscan_filter_unmergeable_patterns(use_hyperscan, monkeypatch):
+    if use_hyperscan:
+        pytest.importorskip("hyperscan")
+    else:
+        monkeypatch.setattr(filters_module, "hyperscan", None)
+    backrefs = HyperscanFilter(r"(a)\1", r"(b)\1")
+    assert backrefs.filter("xbb")
+    assert backrefs.filter("xaa")
+    assert not backrefs.filter("xab")
+    flags = HyperscanFilter("(?i)error", "warn")
+    assert flags.filter("ERROR: boom")
+    assert flags.filter("warn: low")
+    assert not flags.filter("WARN: low")
+    exclusions = HyperscanFilter(r"(a)\1", "(?i)debug", mode="blacklist")
+    assert not exclusions.filter("xaa")
+    assert not exclusions.filter("DEBUG x")
+    assert exclusions.filter("xab")
+    composite = CompositeFilter([RegexFilter(r"(b)\1"), RegexFilter("(?i)error")], mode="OR")
+    compiled = composite.compile()
+    assert [compiled.filter(x) for x in ("xbb", "Error", "xab")] == [True, True, False]
+
+
+def test_hyperscan_filter_lines_with_lone_surrogates():
+    pytest.importorskip("hyperscan")
+    line = b"ERROR \xff x".decode("utf-8", "surrogateescape")
+    whitelist = HyperscanFilter("ERROR", "WARN")
+    assert whitelist.uses_hyperscan
+    assert whitelist.filter(line)
+    assert not whitelist.filter("INFO \udcff")
+    blacklist = HyperscanFilter("DEBUG", "TRACE", mode="blacklist")
+    assert blacklist.filter(line)
+    assert not blacklist.filter("DEBUG \udcff")
+    assert blacklist.filter_lines([line, "TRACE \udcff"]) == [line]
+
+
+def test_hyperscan_filter_invalid():
+    with pytest.raises(FilterError):
+        HyperscanFilter()
+    with pytest.raises(FilterError):
+        HyperscanFilter("(unclosed")
+    with pytest.raises(FilterError):
+        HyperscanFilter("x", mode="graylist")  # type: ignore[arg-type]
+
+
+def test_composite_filter_compile():
+    f = CompositeFilter([RegexFilter("ERROR"), RegexFilter(r"WARN\w*")], mode="OR").compile()
+    assert isinstance(f, HyperscanFilter)
+    assert f.filter("WARNING: low memory")
+    assert not f.filter("INFO: ok")
+    mixed = CompositeFilter([RegexFilter("ERROR"), PredicateFilter(bool)], mode="OR")
+    assert mixed.compile() is mixed
+    conjunction = CompositeFilter([RegexFilter("ERROR"), RegexFilter("disk")])
+    assert conjunction.compile() is conjunction
+    exclusions = CompositeFilter(
+        [RegexFilter("DEBUG", mode="blacklist"), RegexFilter(r"TRACE\d", mode="blacklist")]
+    ).compile()
+    assert isinstance(exclusions, HyperscanFilter)
+    assert exclusions.mode == "blacklist"
+    assert exclusions.filter("ERROR: boom")
+    assert not exclusions.filter("TRACE1: noise")
+    assert not exclusions.filter("DEBUG: noise")
+
+
+def test_composite_filter_compile_keeps_re2_children():
+    pytest.importorskip("re2")
+    children = [RegexFilter(r"ERR\w+", engine="re2"), RegexFilter(r"\pL+X", engine="re2")]
+    composite = CompositeFilter(children, mode="OR")
+    assert composite.compile() is composite
+    assert composite.filter("abcX")
+
+
+def test_required_literals():
+    assert RegexFilter("ERROR").required_literals() == ("ERROR",)
+    assert RegexFilter("ERROR", mode="blacklist").required_literals() is None
+    assert RegexFilter(r"^ERROR \d+").required_literals() == ("ERROR ",)
+    assert RegexFilter(r"^E\w+").required_literals() is None
+    assert PredicateFilter(lambda line: True).required_literals() is None
+    and_filter = CompositeFilter(
+        [RegexFilter("A|B|C"), PredicateFilter(lambda line: True), RegexFilter("D")]
+    )
+    assert and_filter.required_literals() == ("D",)
+    or_filter = CompositeFilter(
+        [RegexFilter("ERROR"), CompositeFilter([RegexFilter("WARN"), RegexFilter(r"\d")])],
+        mode="OR",
+    )
+    assert or_filter.required_literals() == ("ERROR", "WARN")
+    partial_or = CompositeFilter([RegexFilter("A"), RegexFilter(r"\d")], mode="OR")
+    assert partial_or.required_literals() is None
+
+
+def test_build_prefilter():
+    prefilter = build_prefilter([RegexFilter.union("ERROR", "CRITICAL"), RegexFilter("x.y")])
+    assert prefilter is not None
+    assert prefilter.search(b"INFO: ok\nCRITICAL: boom\n")
+    assert not prefilter.search(b"INFO: ok\nDEBUG: noise\n")
+
+
+def test_build_prefilter_not_applicable():
+    assert build_prefilter([]) is None
+    assert build_prefilter([RegexFilter("DEBUG", mode="blacklist")]) is None
+    assert build_prefilter([RegexFilter("ERROR")], encoding="utf-16") is None
+    assert build_prefilter([RegexFilter("ERROR")], errors="ignore") is None
+    assert build_prefilter([RegexFilter("ERROR")], errors="backslashreplace") is None
+    assert build_prefilter([RegexFilter("bad \ufffd")]) is None
@@ -0,0 +1,731 @@
+from __future__ import annotations
+
+import dataclasses
+import threading
+from datetime import datetime, timezone
+
+import pytest
+from watchdog.events import FileModifiedEvent
+
+from log_interceptor import (
+    BaseFilter,
+    CompositeFilter,
+    ConfigurationError,
+    FileWatchError,
+    FilterError,
+    InterceptorConfig,
+    InterceptorStats,
+    LogBufferError,
+    LogEntry,
+    LogInterceptor,
+    LogInterceptorError,
+    PredicateFilter,
+    RegexFilter,
+)
+from log_interceptor import interceptor as interceptor_module
+from log_interceptor.interceptor import _UtcIsoFormatter
+
+FAST = InterceptorConfig(debounce_interval=0.01, retry_delay=0.01)
+keeps_handles_open = pytest.mark.skipif(
+    not interceptor_module._KEEP_HANDLES_OPEN, reason="handles are closed after each pass"
+)
+
+
+# -- config ----------------------------------------------------------------
+
+
+def test_config_defaults():
+    config = InterceptorConfig()
+    assert config.debounce_interval == 0.1
+    assert config.buffer_size == 10_000
+    assert config.encoding == "utf-8"
+    assert config.follow_rotations
+
+
+def test_config_immutable_after_creation():
+    config = InterceptorConfig()
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        config.buffer_size = 5  # type: ignore[misc]
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"debounce_interval": -1},
+        {"poll_interval": -1},
+        {"buffer_size": 0},
+        {"retry_max_attempts": 0},
+        {"retry_delay": -0.1},
+        {"encoding": "no-such-codec"},
+        {"encoding": "utf-16-le"},
+        {"encoding": "utf-32"},
+        {"decode_errors": "strict"},
+        {"decode_errors": "no-such-handler"},
+    ],
+)
+def test_config_validation(kwargs):
+    with pytest.raises(ConfigurationError):
+        InterceptorConfig(**kwargs)
+    with pytest.raises(ValueError):
+        InterceptorConfig(**kwargs)
+
+
+def test_config_presets():
+    aggressive = InterceptorConfig.from_preset("aggressive")
+    conservative = InterceptorConfig.from_preset("conservative")
+    assert aggressive.debounce_interval < InterceptorConfig().debounce_interval
+    assert conservative.debounce_interval > InterceptorConfig().debounce_interval
+    assert InterceptorConfig.from_preset("balanced") == InterceptorConfig()
+    assert InterceptorConfig.from_preset("aggressive", buffer_size=7).buffer_size == 7
+
+
+def test_config_presets_are_cached():
+    aggressive = InterceptorConfig.from_preset("aggressive")
+    assert aggressive is InterceptorConfig.from_preset("aggressive")
+    overridden = InterceptorConfig.from_preset("conservative", buffer_size=7, retry_delay=1.0)
+    assert overridden is InterceptorConfig.from_preset(
+        "conservative", retry_delay=1.0, buffer_size=7
+    )
+    assert overridden is not InterceptorConfig.from_preset("conservative")
+
+
+def test_config_unknown_preset():
+    with pytest.raises(ConfigurationError):
+        InterceptorConfig.from_preset("turbo")
+
+
+def test_config_from_dict():
+    assert InterceptorConfig.from_dict({"buffer_size": 5}).buffer_size == 5
+    with pytest.raises(ConfigurationError):
+        InterceptorConfig.from_dict({"bufer_size": 5})
+
+
+def test_config_from_env():
+    config = InterceptorConfig.from_env(
+        environ={
+            "LOG_INTERCEPTOR_DEBOUNCE_INTERVAL": "0.5",
+            "LOG_INTERCEPTOR_BUFFER_SIZE": "42",
+            "LOG_INTERCEPTOR_FOLLOW_ROTATIONS": "false",
+            "LOG_INTERCEPTOR_ENCODING": "latin-1",
+        }
+    )
+    assert config == InterceptorConfig(
+        debounce_interval=0.5, buffer_size=42, follow_rotations=False, encoding="latin-1"
+    )
+    with pytest.raises(ConfigurationError):
+        InterceptorConfig.from_env(environ={"LOG_INTERCEPTOR_BUFFER_SIZE": "many"})
+
+
+# -- exceptions ------------------------------------------------------------
+
+
+def test_exception_hierarchy():
+    for exc in (FileWatchError, FilterError, LogBufferError, ConfigurationError):
+        assert issubclass(exc, LogInterceptorError)
+
+
+# -- interceptor -----------------------------------------------------------
+
+
+def test_interceptor_start_stop(source_file):
+    interceptor = LogInterceptor(source_file, config=FAST)
+    assert not interceptor.is_running()
+    interceptor.start()
+    assert interceptor.is_running()
+    interceptor.start()  # idempotent
+    interceptor.stop()
+    assert not interceptor.is_running()
+    interceptor.stop()
+
+
+def test_interceptor_missing_directory(tmp_path):
+    interceptor = LogInterceptor(tmp_path / "missing" / "app.log")
+    with pytest.raises(FileWatchError):
+        interceptor.start()
+
+
+def test_interceptor_captures_new_lines_only(source_file, writer, wait_for):
+    source_file.write_text("Initial line\n")
+    with LogInterceptor(source_file, config=FAST) as interceptor:
+        writer.write_line("Line 1")
+        writer.write_line("Line 2")
+        assert wait_for(lambda: len(interceptor.get_buffered_lines()) == 2)
+    assert interceptor.get_buffered_lines() == ["Line 1", "Line 2"]
+
+
+def test_interceptor_source_through_symlinked_directory(tmp_path, wait_for):
+    (tmp_path / "real").mkdir()
+    (tmp_path / "link").symlink_to(tmp_path / "real", target_is_directory=True)
+    source = tmp_path / "link" / "app.log"
+    with LogInterceptor(source, config=FAST) as interceptor:
+        (tmp_path / "real" / "app.log").write_text("via symlink\n")
+        assert wait_for(lambda: interceptor.get_buffered_lines() == ["via symlink"])
+
+
+def test_event_handler_matches_str_and_bytes_paths():
+    class _Interceptor:
+        notified = 0
+
+        def _notify(self):
+            self.notified += 1
+
+    interceptor = _Interceptor()
+    handler = interceptor_module._LogFileEventHandler(interceptor, "/logs/app.log")
+    handler.on_modified(FileModifiedEvent("/logs/app.log"))
+    handler.on_modified(FileModifiedEvent(b"/logs/app.log"))
+    handler.on_modified(FileModifiedEvent("/logs/other.log"))
+    assert interceptor.notified == 2
+
+
+def test_interceptor_adaptive_debounce(source_file):
+    config = InterceptorConfig(debounce_interval=0.5)
+    interceptor = LogInterceptor(source_file, config=config)
+    assert interceptor._debounce_delay() == 0.5
+    interceptor._event_gap = 2.0  # sparse events: read almost immediately
+    assert interceptor._debounce_delay() == 0.001
+    fixed = LogInterceptor(source_file, config=dataclasses.replace(config, adaptive_debounce=False))
+    fixed._event_gap = 2.0
+    assert fixed._debounce_delay() == 0.5
+
+
+def test_interceptor_stop_drains_pending_lines(source_file, writer):
+    interceptor = LogInterceptor(source_file, config=InterceptorConfig(debounce_interval=5))
+    interceptor.start()
+    writer.write_line("written just before stop")
+    interceptor.stop()
+    assert interceptor.get_buffered_lines() == ["written just before stop"]
+
+
+def test_interceptor_waits_for_complete_lines(source_file, wait_for):
+    with LogInterceptor(source_file, config=FAST) as interceptor:
+        with source_file.open("a") as f:
+            f.write("partial")
+        with source_file.open("a") as f:
+            f.write(" line\r\nnext\n")
+        assert wait_for(lambda: len(interceptor.get_buffered_lines()) == 2)
+    assert interceptor.get_buffered_lines() == ["partial line", "next"]
+
+
+def test_interceptor_does_not_reread_partial_lines(source_file, wait_for):
+    with LogInterceptor(source_file, config=FAST) as interceptor:
+        with source_file.open("a") as f:
+            f.write("par")
+        assert wait_for(lambda: interceptor._pending == b"par")
+        with source_file.open("r+b") as f:
+            f.write(b"PAR")  # overwrite the bytes already read
+            f.seek(0, 2)
+            f.write(b"tial\n")
+    assert interceptor.get_buffered_lines() == ["partial"]
+
+
+def test_interceptor_reads_in_bounded_chunks(source_file, writer, monkeypatch):
+    monkeypatch.setattr(interceptor_module, "_READ_CHUNK_SIZE", 7)
+    lines = ["short", "a line longer than one chunk", "", "x" * 20, "end"]
+    with LogInterceptor(source_file, config=FAST) as interceptor:
+        writer.write_burst(lines, interval=0)
+    assert interceptor.get_buffered_lines() == lines
+
+
+def test_interceptor_ignores_rejected_read_ahead_hint(source_file, writer, monkeypatch):
+    def fadvise(*args):
+        raise OSError(22, "Invalid argument")
+
+    monkeypatch.setattr(interceptor_module.os, "posix_fadvise", fadvise, raising=False)
+    monkeypatch.setattr(interceptor_module.os, "POSIX_FADV_SEQUENTIAL", 2, raising=False)
+    with LogInterceptor(source_file, config=FAST) as interceptor:
+        writer.write_line("still read")
+    assert interceptor.get_buffered_lines() == ["still read"]
+    assert interceptor.get_stats()["errors"] == 0
+
+
+def test_interceptor_decode_errors(source_file):
+    config = dataclasses.replace(FAST, encoding="ascii", decode_errors="ignore")
+    with LogInterceptor(source_file, config=config) as interceptor:
+        source_file.write_bytes(b"caf\xc3\xa9 ok\n")
+    assert interceptor.get_buffered_lines() == ["caf ok"]
+
+
+def test_interceptor_decode_errors_stay_within_line(source_file):
+    with LogInterceptor(source_file, config=FAST) as interceptor:
+        source_file.write_bytes(b"cut \xc3\nbad \xff\r\nok\n")
+    assert interceptor.get_buffered_lines() == ["cut \ufffd", "bad \ufffd", "ok"]
+
+
+def test_interceptor_writes_target_file(source_file, target_file, writer):
+    with LogInterceptor(source_file, target_file, config=FAST):
+        writer.write_burst(["a", "b", "c"])
+    assert target_file.read_text() == "a\nb\nc\n"
+
+
+@pytest.mark.parametrize(
+    ("decode_errors", "expected"),
+    [("replace", b"caf?? ok\n"), ("surrogateescape", b"caf\xc3\xa9 ok\n")],
+)
+def test_interceptor_writes_undecodable_lines_to_target(
+    source_file, target_file, decode_errors, expected
+):
+    config = dataclasses.replace(FAST, encoding="ascii", decode_errors=decode_errors)
+    with LogInterceptor(source_file, target_file, config=config) as interceptor:
+        source_file.write_bytes(b"caf\xc3\xa9 ok\n")
+    assert target_file.read_bytes() == expected
+    assert interceptor.get_stats()["errors"] == 0
+
+
+@keeps_handles_open
+def test_interceptor_follows_rotated_target_file(source_file, target_file, writer, wait_for):
+    rotated = target_file.with_name("target.log.1")
+    with LogInterceptor(source_file, target_file, config=FAST) as interceptor:
+        writer.write_line("before")
+        assert wait_for(lambda: target_file.exists() and target_file.read_text() == "before\n")
+        first_fd = interceptor._target_fd
+        writer.write_line("same file")
+        assert wait_for(lambda: target_file.read_text() == "before\nsame file\n")
+        assert interceptor._target_fd == first_fd
+        target_file.rename(rotated)
+        writer.write_line("after")
+        assert wait_for(lambda: target_file.exists())
+    assert interceptor._target_fd is None
+    assert rotated.read_text() == "before\nsame file\n"
+    assert target_file.read_text() == "after\n"
+
+
+def test_interceptor_keeps_batches_the_target_rejects(source_file, target_file, writer, wait_for):
+    target_file.mkdir()  # opening it for writing fails
+    with LogInterceptor(source_file, target_file, config=FAST) as interceptor:
+        writer.write_line("one")
+        assert wait_for(lambda: interceptor.get_stats()["target_errors"] == 3)
+        target_file.rmdir()
+        writer.write_line("two")
+        assert wait_for(lambda: target_file.is_file() and target_file.read_text() == "one\ntwo\n")
+    assert interceptor.get_buffered_lines() == ["one", "two"]
+    assert interceptor.get_stats()["errors"] == 0
+
+
+def test_interceptor_appends_target_file_with_bom_once(source_file, target_file):
+    config = dataclasses.replace(FAST, encoding="utf-8-sig")
+    with LogInterceptor(source_file, target_file, config=config):
+        source_file.write_text("first\n")
+    with LogInterceptor(source_file, target_file, config=config):
+        with source_file.open("a") as f:
+            f.write("second\n")
+    assert target_file.read_bytes() == b"\xef\xbb\xbffirst\nsecond\n"
+
+
+def test_interceptor_adds_timestamps(source_file, target_file, writer):
+    with LogInterceptor(source_file, target_file, add_timestamps=True, config=FAST):
+        writer.write_line("Test line")
+    content = target_file.read_text()
+    assert content.startswith("[CAPTURED_AT: ")
+    assert content.endswith("+00:00] Test line\n")
+
+
+def test_interceptor_lines_read_together_share_timestamp(source_file, target_file):
+    with LogInterceptor(source_file, target_file, add_timestamps=True, config=FAST) as li:
+        source_file.write_text("one\ntwo\n")
+    first, second = li.get_lines_with_metadata()
+    assert first.timestamp == second.timestamp
+    prefixes = [line.split("] ")[0] for line in target_file.read_text().splitlines()]
+    assert prefixes[0] == prefixes[1]
+
+
+def test_utc_iso_formatter_matches_datetime():
+    fmt = _UtcIsoFormatter()
+    timestamps = (1_700_000_000.25, 1_700_000_000.5, 1_700_000_001.75, 0.0, 1_700_000_000.9999996)
+    for ts in (*timestamps, *(1_700_000_000 + i / 7919 for i in range(7919))):
+        expected = datetime.fromtimestamp(ts, tz=timezone.utc).isoformat(timespec="microseconds")
+        assert fmt(ts) == expected
+
+
+def test_interceptor_with_filters(source_file, writer):
+    filters = [
+        RegexFilter(r"ERROR"),
+        PredicateFilter(lambda line: "critical" in line.lower()),
+    ]
+    with LogInterceptor(source_file, filters=filters, config=FAST) as interceptor:
+        writer.write_burst(["INFO: ok", "ERROR: minor", "ERROR: Critical failure"])
+    assert interceptor.get_buffered_lines() == ["ERROR: Critical failure"]
+
+
+def test_interceptor_with_composite_filter(source_file, writer):
+    composite = CompositeFilter([RegexFilter("ERROR"), RegexFilter("WARNING")], mode="OR")
+    with LogInterceptor(source_file, filters=[composite], config=FAST) as interceptor:
+        writer.write_burst(["INFO: a", "WARNING: b", "ERROR: c", "DEBUG: d"])
+    assert interceptor.get_buffered_lines() == ["WARNING: b", "ERROR: c"]
+
+
+def test_interceptor_failing_filter_drops_line(source_file, writer):
+    broken = PredicateFilter(lambda line: 1 / (len(line) - 4) > 0)
+    with LogInterceptor(source_file, filters=[broken], config=FAST) as interceptor:
+        writer.write_burst(["four", "longer"])
+    assert interceptor.get_buffered_lines() == ["longer"]
+    assert interceptor.get_stats()["errors"] == 1
+
+
+def test_interceptor_filter_raising_any_error_keeps_monitoring(source_file, writer, wait_for):
+    class Picky(BaseFilter):
+        def filter(self, line):
+            if line == "bad":
+                raise ValueError(line)
+            return True
+
+    with LogInterceptor(source_file, filters=[Picky()], config=FAST) as interceptor:
+        writer.write_burst(["bad", "good"])
+        assert wait_for(lambda: interceptor.get_buffered_lines() == ["good"])
+        writer.write_line("later")
+    assert interceptor.get_buffered_lines() == ["good", "later"]
+    assert interceptor.get_stats()["errors"] == 1
+
+
+def test_interceptor_unexpected_error_keeps_worker_running(source_file, writer, wait_for):
+    with LogInterceptor(source_file, config=FAST) as interceptor:
+        process_chunk = interceptor._process_chunk
+
+        def fail_once(data, end):
+            interceptor._process_chunk = process_chunk
+            raise RuntimeError("boom")
+
+        interceptor._process_chunk = fail_once
+        writer.write_line("lost")
+        assert wait_for(lambda: interceptor.get_stats()["errors"] == 1)
+        writer.write_line("kept")
+        assert wait_for(lambda: interceptor.get_buffered_lines() == ["kept"])
+
+
+def test_interceptor_callbacks(source_file, writer):
+    received = []
+    with LogInterceptor(source_file, config=FAST) as interceptor:
+        interceptor.add_callback(lambda line, ts, eid: received.append((line, ts, eid)))
+        writer.write_burst(["one", "two"])
+    assert [line for line, _, _ in received] == ["one", "two"]
+    assert [eid for _, _, eid in received] == [1, 2]
+    assert all(isinstance(ts, float) for _, ts, _ in received)
+
+
+def test_interceptor_callback_error_does_not_stop_monitoring(source_file, writer):
+    received = []
+
+    def broken(line, ts, eid):
+        raise RuntimeError("boom")
+
+    with LogInterceptor(source_file, config=FAST) as interceptor:
+        interceptor.add_callback(broken)
+        interceptor.add_callback(lambda line, ts, eid: received.append(line))
+        writer.write_burst(["one", "two"])
+    assert received == ["one", "two"]
+    assert interceptor.get_stats()["errors"] == 2
+
+
+def test_interceptor_batch_callbacks(source_file, writer, wait_for):
+    batches = []
+
+    def collect(lines, ts, first_id):
+        batches.append((lines, first_id))
+
+    with LogInterceptor(source_file, config=FAST) as interceptor:
+        interceptor.add_batch_callback(collect)
+        interceptor.add_batch_callback(lambda lines, ts, first_id: 1 / 0)
+        writer.write_burst(["one", "two"])
+        assert wait_for(lambda: sum(len(lines) for lines, _ in batches) == 2)
+        interceptor.remove_batch_callback(collect)
+        writer.write_line("three")
+    assert [line for lines, _ in batches for line in lines] == ["one", "two"]
+    assert batches[0][1] == 1
+    assert all(type(lines) is tuple for lines, _ in batches)
+    assert interceptor.get_stats()["errors"] >= 2
+
+
+def test_interceptor_event_ids_count_captured_lines_only(source_file, writer, wait_for):
+    with LogInterceptor(source_file, config=FAST, filters=[RegexFilter("ERROR")]) as interceptor:
+        writer.write_burst(["ERROR a", "INFO b", "ERROR c"])
+        assert wait_for(lambda: len(interceptor.get_buffered_lines()) == 2)
+        writer.write_burst(["INFO d", "ERROR e"])
+        assert wait_for(lambda: len(interceptor.get_buffered_lines()) == 3)
+    entries = interceptor.get_lines_with_metadata()
+    assert [entry.event_id for entry in entries] == [1, 2, 3]
+
+
+def test_interceptor_slow_callback_does_not_block_capture(source_file, writer, wait_for):
+    release = threading.Event()
+    received = []
+
+    def slow(line, ts, eid):
+        release.wait(5)
+        received.append((line, eid))
+
+    with LogInterceptor(source_file, config=FAST) as interceptor:
+        interceptor.add_callback(slow)
+        writer.write_line("one")
+        assert wait_for(lambda: interceptor.get_buffered_lines() == ["one"])
+        writer.write_line("two")
+        assert wait_for(lambda: interceptor.get_buffered_lines() == ["one", "two"])
+        assert received == []
+        release.set()
+    assert received == [("one", 1), ("two", 2)]
+
+
+def test_interceptor_remove_callback(source_file, writer, wait_for):
+    received = []
+
+    def callback(line, ts, eid):
+        received.append(line)
+
+    with LogInterceptor(source_file, config=FAST) as interceptor:
+        interceptor.add_callback(callback)
+        writer.write_line("one")
+        assert wait_for(lambda: received == ["one"])
+        interceptor.remove_callback(callback)
+        interceptor.remove_callback(callback)
+        writer.write_line("two")
+    assert received == ["one"]
+    with pytest.raises(TypeError):
+        interceptor.add_callback("not callable")  # type: ignore[arg-type]
+
+
+def test_interceptor_get_lines_with_metadata(source_file, writer):
+    with LogInterceptor(source_file, config=FAST) as interceptor:
+        writer.write_burst(["first", "second"])
+    entries = interceptor.get_lines_with_metadata()
+    assert [entry.line for entry in entries] == ["first", "second"]
+    assert [entry.event_id for entry in entries] == [1, 2]
+    assert entries[0].timestamp <= entries[1].timestamp
+    assert isinstance(entries[0], LogEntry)
+
+
+def test_interceptor_buffer_overflow_fifo(source_file, writer):
+    config = dataclasses.replace(FAST, buffer_size=3)
+    with LogInterceptor(source_file, config=config) as interceptor:
+        writer.write_burst([f"Line {i}" for i in range(5)])
+    assert interceptor.get_buffered_lines() == ["Line 2", "Line 3", "Line 4"]
+    assert interceptor.get_buffered_lines(last_n=5) == ["Line 2", "Line 3", "Line 4"]
+    assert interceptor.get_buffered_lines(last_n=2) == ["Line 3", "Line 4"]
+    assert interceptor.get_buffered_lines(last_n=0) == []
+    with pytest.raises(LogBufferError):
+        interceptor.get_buffered_lines(last_n=-1)
+
+
+def test_interceptor_get_buffered_lines_with_filters(source_file, writer):
+    with LogInterceptor(source_file, config=FAST) as interceptor:
+        writer.write_burst(["ERROR 1", "INFO 2", "ERROR 3", "ERROR x", "ERROR 5"])
+    errors = [RegexFilter(r"ERROR \d")]
+    assert interceptor.get_buffered_lines(filters=errors) == ["ERROR 1", "ERROR 3", "ERROR 5"]
+    assert interceptor.get_buffered_lines(last_n=2, filters=errors) == ["ERROR 3", "ERROR 5"]
+    assert interceptor.get_buffered_lines(last_n=0, filters=errors) == []
+    assert interceptor.get_buffered_lines(last_n=5, filters=errors) == [
+        "ERROR 1",
+        "ERROR 3",
+        "ERROR 5",
+    ]
+    odd = [*errors, PredicateFilter(lambda line: line[-1] in "13579")]
+    assert interceptor.get_buffered_lines(filters=odd) == ["ERROR 1", "ERROR 3", "ERROR 5"]
+    with pytest.raises(FilterError):
+        interceptor.get_buffered_lines(filters=[PredicateFilter(lambda line: 1 / 0)])
+
+
+def test_interceptor_buffer_clear(source_file, writer):
+    with LogInterceptor(source_file, config=FAST) as interceptor:
+        writer.write_line("line")
+    interceptor.clear_buffer()
+    assert interceptor.get_buffered_lines() == []
+    assert interceptor.get_lines_with_metadata() == []
+
+
+def test_interceptor_buffer_clear_releases_lines(source_file, writer, wait_for):
+    with LogInterceptor(source_file, config=FAST) as interceptor:
+        writer.write_line("while running")
+        assert wait_for(lambda: interceptor.get_buffered_lines() == ["while running"])
+        interceptor.clear_buffer()
+        assert wait_for(lambda: not any(interceptor._buffer._columns[0]))
+        writer.write_line("after stop")
+    interceptor.clear_buffer()
+    assert not any(interceptor._buffer._columns[0])
+
+
+def test_interceptor_buffer_disabled(source_file, writer):
+    received = []
+    with LogInterceptor(source_file, use_buffer=False, config=FAST) as interceptor:
+        interceptor.add_callback(lambda line, ts, eid: received.append(line))
+        writer.write_line("line")
+    assert interceptor.get_buffered_lines() == []
+    assert received == ["line"]
+    assert interceptor._buffer.size == 1
+
+
+def test_interceptor_pause_resume(source_file, writer, wait_for):
+    with LogInterceptor(source_file, config=FAST) as interceptor:
+        interceptor.pause()
+        assert interceptor.is_paused()
+        writer.write_line("during pause")
+        assert not wait_for(lambda: interceptor.get_buffered_lines(), timeout=0.2)
+        interceptor.resume()
+        assert not interceptor.is_paused()
+        assert wait_for(lambda: interceptor.get_buffered_lines() == ["during pause"])
+
+
+def test_interceptor_handles_file_rotation(source_file, writer, wait_for):
+    with LogInterceptor(source_file, config=FAST) as interceptor:
+        writer.write_line("before rotation")
+        assert wait_for(lambda: len(interceptor.get_buffered_lines()) == 1)
+        writer.rotate_file()
+        writer.write_line("after rotation")
+        assert wait_for(lambda: len(interceptor.get_buffered_lines()) == 2)
+    assert interceptor.get_buffered_lines() == ["before rotation", "after rotation"]
+
+
+@keeps_handles_open
+def test_interceptor_keeps_source_open_between_reads(source_file, writer, wait_for):
+    with LogInterceptor(source_file, config=FAST) as interceptor:
+        writer.write_line("first")
+        assert wait_for(lambda: len(interceptor.get_buffered_lines()) == 1)
+        reader = interceptor._reader
+        assert reader is not None
+        writer.write_line("second")
+        assert wait_for(lambda: len(interceptor.get_buffered_lines()) == 2)
+        assert interceptor._reader is reader
+    assert interceptor._reader is None
+    assert reader.closed
+
+
+@keeps_handles_open
+def test_interceptor_closes_handles_after_each_pass(
+    source_file, target_file, writer, wait_for, monkeypatch
+):
+    monkeypatch.setattr(interceptor_module, "_KEEP_HANDLES_OPEN", False)
+    with LogInterceptor(source_file, target_file, config=FAST) as interceptor:
+        writer.write_line("before rotation")
+        assert wait_for(lambda: len(interceptor.get_buffered_lines()) == 1)
+        assert wait_for(lambda: interceptor._reader is None and interceptor._target_fd is None)
+        writer.rotate_file()
+        writer.write_line("after rotation")
+        assert wait_for(lambda: len(interceptor.get_buffered_lines()) == 2)
+    assert target_file.read_text() == "before rotation\nafter rotation\n"
+
+
+@keeps_handles_open
+def test_interceptor_stats_open_source_until_path_changes(
+    source_file, writer, wait_for, monkeypatch
+):
+    path_stats = []
+    path_stat = type(source_file).stat
+
+    def counting_stat(self, *args, **kwargs):
+        if self == source_file:
+            path_stats.append(self)
+        return path_stat(self, *args, **kwargs)
+
+    with LogInterceptor(source_file, config=FAST) as interceptor:
+        writer.write_line("first")
+        assert wait_for(lambda: len(interceptor.get_buffered_lines()) == 1)
+        monkeypatch.setattr(type(source_file), "stat", counting_stat)
+        writer.write_line("second")
+        assert wait_for(lambda: len(interceptor.get_buffered_lines()) == 2)
+        assert path_stats == []
+        writer.rotate_file()
+        writer.write_line("third")
+        assert wait_for(lambda: len(interceptor.get_buffered_lines()) == 3)
+        assert path_stats
+
+
+def test_interceptor_polling_mode(source_file, writer, wait_for):
+    config = dataclasses.replace(FAST, poll_interval=0.01)
+    with LogInterceptor(source_file, config=config) as interceptor:
+        assert interceptor._observer is None
+        writer.write_line("polled")
+        assert wait_for(lambda: interceptor.get_buffered_lines() == ["polled"])
+        writer.rotate_file()
+        writer.write_line("after rotation")
+        assert wait_for(lambda: len(interceptor.get_buffered_lines()) == 2)
+    assert interceptor.get_buffered_lines() == ["polled", "after rotation"]
+    assert interceptor.get_stats()["events_processed"] == 0
+
+
+def test_interceptor_polls_again_soon_after_data(source_file, writer, wait_for):
+    config = dataclasses.replace(FAST, poll_interval=1.0)
+    with LogInterceptor(source_file, config=config) as interceptor:
+        writer.write_line("first")
+        assert wait_for(lambda: len(interceptor.get_buffered_lines()) == 1)
+        writer.write_line("second")
+        # Well below poll_interval: the poll after a read comes at once.
+        assert wait_for(lambda: len(interceptor.get_buffered_lines()) == 2, timeout=0.3)
+
+
+def test_interceptor_handles_truncation(source_file, writer, wait_for):
+    with LogInterceptor(source_file, config=FAST) as interceptor:
+        writer.write_line("a fairly long line before truncation")
+        assert wait_for(lambda: len(interceptor.get_buffered_lines()) == 1)
+        source_file.write_text("short\n")
+        assert wait_for(lambda: len(interceptor.get_buffered_lines()) == 2)
+    assert interceptor.get_buffered_lines()[-1] == "short"
+
+
+def test_interceptor_source_created_after_start(tmp_path, wait_for):
+    source = tmp_path / "late.log"
+    with LogInterceptor(source, config=FAST) as interceptor:
+        source.write_text("hello\n")
+        assert wait_for(lambda: interceptor.get_buffered_lines() == ["hello"])
+
+
+def test_interceptor_ignores_other_files(tmp_path, source_file, writer):
+    with LogInterceptor(source_file, config=FAST) as interceptor:
+        (tmp_path / "other.log").write_text("noise\n")
+        writer.write_line("signal")
+    assert interceptor.get_buffered_lines() == ["signal"]
+
+
+def test_interceptor_statistics(source_file, writer):
+    interceptor = LogInterceptor(source_file, config=FAST)
+    assert interceptor.get_stats()["start_time"] is None
+    with interceptor:
+        writer.write_burst(["a", "b", "c"])
+    stats = interceptor.get_stats()
+    assert stats["lines_captured"] == 3
+    assert stats["events_processed"] >= 1
+    assert stats["buffered_lines"] == 3
+    assert not stats["is_running"]
+    assert stats["stop_time"] >= stats["start_time"]
+    assert stats["uptime_seconds"] >= 0
+    assert stats.keys() == InterceptorStats.__annotations__.keys()
+
+
+def test_interceptor_uptime_ignores_wall_clock(source_file, monkeypatch):
+    interceptor = LogInterceptor(source_file, config=FAST)
+    with interceptor:
+        monkeypatch.setattr(interceptor_module.time, "time", lambda: 0.0)
+    monkeypatch.undo()
+    assert 0 <= interceptor.get_stats()["uptime_seconds"] < 60
+
+
+def test_interceptor_keeps_filter_order(source_file):
+    filters = [RegexFilter(r"^\d+ "), PredicateFilter(lambda line: int(line.split()[0]) > 5)]
+    with LogInterceptor(source_file, filters=filters, config=FAST) as interceptor:
+        source_file.write_text("3 low\nheader\n7 high\n")
+    assert interceptor.get_buffered_lines() == ["7 high"]
+    assert interceptor.get_stats()["errors"] == 0
+
+
+def test_interceptor_prefilter_skips_chunks_without_candidates(source_file, writer):
+    received = []
+    filters = [RegexFilter("ERROR")]
+    with LogInterceptor(source_file, filters=filters, config=FAST) as interceptor:
+        assert interceptor._prefilter is not None
+        interceptor.add_callback(lambda line, ts, eid: received.append(line))
+        writer.write_burst(["INFO: a", "DEBUG: b"])
+        writer.write_burst(["INFO: c", "ERROR: d"])
+    assert received == ["ERROR: d"]
+
+
+def test_interceptor_prefilter_decodes_only_candidate_lines(source_file):
+    filters = [RegexFilter("ERROR"), PredicateFilter(lambda line: not line.endswith("skip"))]
+    with LogInterceptor(source_file, filters=filters, config=FAST) as interceptor:
+        source_file.write_bytes(
+            b"ERROR: first\nINFO: \xff\nERROR ERROR: twice\r\n"
+            b"INFO: ERROR skip\nDEBUG\nERROR: last\n"
+        )
+    assert interceptor.get_buffered_lines() == ["ERROR: first", "ERROR ERROR: twice", "ERROR: last"]
+
+
+def test_interceptor_prefilter_off_when_decoding_drops_bytes(source_file):
+    config = dataclasses.replace(FAST, decode_errors="ignore")
+    with LogInterceptor(source_file, filters=[RegexFilter("ERROR")], config=config) as interceptor:
+        assert interceptor._prefilter is None
+        source_file.write_bytes(b"ER\xffROR: split\nINFO: ok\n")
+    assert interceptor.get_buffered_lines() == ["ERROR: split"]
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import pytest
+
+from log_interceptor._ring import SpscRing
+
+
+def test_ring_capacity_is_power_of_two_above_size():
+    assert len(SpscRing(5)._columns[0]) == 8
+    assert len(SpscRing(8)._columns[0]) == 16
+
+
+def test_ring_keeps_newest_size_records():
+    ring = SpscRing(3, (None, "q"))
+    for i in range(10):
+        ring.push(f"line {i}", i)
+    assert len(ring) == 3
+    assert ring.snapshot() == [["line 7", "line 8", "line 9"], [7, 8, 9]]
+
+
+def test_ring_snapshot_across_wraparound():
+    ring = SpscRing(4)
+    for i in range(14):
+        ring.push(i)
+    assert ring.snapshot() == [[10, 11, 12, 13]]
+
+
+def test_ring_typed_columns():
+    ring = SpscRing(2, ("d", "Q"))
+    assert ring.snapshot() == [[], []]
+    for i in range(3):
+        ring.push(i / 2, i)
+    assert ring.snapshot() == [[0.5, 1.0], [1, 2]]
+    assert all(type(column) is list for column in ring.snapshot())
+
+
+def test_ring_snapshot_last_and_columns():
+    ring = SpscRing(4, (None, "Q"))
+    for i in range(6):
+        ring.push(f"line {i}", i)
+    assert ring.snapshot(last=2) == [["line 4", "line 5"], [4, 5]]
+    assert ring.snapshot(last=0) == [[], []]
+    assert ring.snapshot(last=10, columns=(1,)) == [[2, 3, 4, 5]]
+
+
+def test_ring_clear_hides_pushed_records():
+    ring = SpscRing(4)
+    ring.push("old")
+    ring.clear()
+    assert len(ring) == 0
+    assert ring.snapshot() == [[]]
+    ring.push("new")
+    assert ring.snapshot() == [["new"]]
+
+
+def test_ring_snapshot_drops_records_lapped_while_copying():
+    ring = SpscRing(4)
+    for i in range(4):
+        ring.push(i)
+
+    class _Lapping(list):
+        def __getitem__(self, item):
+            result = super().__getitem__(item)
+            ring._head += 2  # the producer pushes two records meanwhile
+            return result
+
+    ring._columns[0] = _Lapping(ring._columns[0])
+    assert ring.snapshot() == [[2, 3]]
+
+
+def test_ring_releases_records_out_of_view():
+    ring = SpscRing(3, (None, "Q"))
+    for i in range(100):
+        ring.push(f"line {i}", i)
+    # Evicted records are released in batches as the producer moves on.
+    assert len(list(filter(None, ring._columns[0]))) < 3 + 64
+    ring.release()
+    assert sorted(filter(None, ring._columns[0])) == ["line 97", "line 98", "line 99"]
+    ring.clear()
+    ring.release()
+    assert not any(ring._columns[0])
+    ring.push("new", 100)
+    assert ring.snapshot() == [["new"], [100]]
+    assert list(filter(None, ring._columns[0])) == ["new"]
+
+
+def test_ring_rejects_non_positive_size():
+    with pytest.raises(ValueError, match="size"):
+        SpscRing(0)